@@ -0,0 +1,146 @@
+import numpy as np
+
+# --- Motor de amortización vectorizado ---
+# Calcula la tabla completa (mes, año, capital, interés, saldo) en una sola
+# pasada de NumPy, para uno o miles de créditos a la vez.
+
+
+def tasa_mensual(tasa_anual):
+    return (1 + np.asarray(tasa_anual, dtype=float)) ** (1 / 12) - 1
+
+
+def dividendo(credito_uf, tasa_anual, plazo):
+    credito = np.asarray(credito_uf, dtype=float)
+    r = tasa_mensual(tasa_anual)
+    n = np.asarray(plazo) * 12
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cuota = np.where(r > 0, credito * r / (1 - (1 + r) ** -n), credito / n)
+    return np.where(credito > 0, cuota, 0.0)
+
+
+def calcular_tabla(credito_uf, tasa_anual, plazo, prepago_monto=0.0, prepago_ano=0):
+    """Tabla de amortización para un lote de créditos.
+
+    Todos los argumentos aceptan escalares o arreglos (se hace broadcast).
+    Devuelve un dict de arreglos de forma (créditos, meses); los meses
+    posteriores al plazo de cada crédito quedan en cero.
+    """
+    credito, tasa, plazo, p_monto, p_ano = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(credito_uf, dtype=float)),
+        np.atleast_1d(np.asarray(tasa_anual, dtype=float)),
+        np.atleast_1d(np.asarray(plazo, dtype=int)),
+        np.atleast_1d(np.asarray(prepago_monto, dtype=float)),
+        np.atleast_1d(np.asarray(prepago_ano, dtype=int)),
+    )
+    credito = np.maximum(credito, 0.0)
+    n = plazo * 12
+    mes = np.arange(1, int(n.max(initial=0)) + 1)
+
+    r = tasa_mensual(tasa)[:, None]
+    cuota = dividendo(credito, tasa, plazo)[:, None]
+    k = mes[None, :]
+    crec = (1 + r) ** k
+    with np.errstate(divide="ignore", invalid="ignore"):
+        anualidad = np.where(r > 0, (crec - 1) / r, k)
+
+    # Saldo cerrado sin prepago y ajuste del prepago capitalizado desde su mes
+    saldo = credito[:, None] * crec - cuota * anualidad
+    mes_prepago = (p_ano * 12)[:, None]
+    con_prepago = (p_monto > 0)[:, None] & (mes_prepago >= 1) & (mes_prepago <= n[:, None])
+    despues = con_prepago & (k >= mes_prepago)
+    saldo -= np.where(despues, p_monto[:, None] * (1 + r) ** np.where(despues, k - mes_prepago, 0), 0.0)
+
+    # El crédito termina cuando el saldo llega a cero (el prepago acorta el plazo)
+    vigente = k <= n[:, None]
+    saldo = np.where(vigente, np.maximum(saldo, 0.0), 0.0)
+    saldo_previo = np.concatenate([credito[:, None], saldo[:, :-1]], axis=1)
+    saldo_previo = np.where(vigente, saldo_previo, 0.0)
+
+    interes = saldo_previo * r
+    prepago_mes = np.where(con_prepago & (k == mes_prepago), p_monto[:, None], 0.0)
+    # El prepago se aplica después de la cuota del mes: a lo más el saldo que ésta deja
+    prepago_mes = np.minimum(prepago_mes, np.maximum(saldo_previo - (cuota - interes), 0.0))
+    capital = np.maximum(saldo_previo - prepago_mes - saldo, 0.0)
+
+    return {
+        "mes": mes,
+        "anio": (mes - 1) // 12 + 1,
+        "capital": capital,
+        "interes": interes,
+        "saldo": saldo,
+        "n_meses": n,
+    }
+
+
+def tabla_credito(credito_uf, tasa_anual, plazo, prepago_monto=0.0, prepago_ano=0):
+    # Versión de un solo crédito: arreglos 1D recortados al plazo
+    tabla = calcular_tabla(credito_uf, tasa_anual, plazo, prepago_monto, prepago_ano)
+    n = int(tabla["n_meses"][0])
+    return {
+        "mes": tabla["mes"][:n],
+        "anio": tabla["anio"][:n],
+        "capital": tabla["capital"][0, :n],
+        "interes": tabla["interes"][0, :n],
+        "saldo": tabla["saldo"][0, :n],
+    }
+
+
+def resumen_lote(credito_uf, tasa_anual, plazo, prepago_monto=0.0, prepago_ano=0, bloque=2000):
+    """Totales por crédito sin guardar la tabla completa.
+
+    Devuelve interes_total, capital_total, anio_cruce (0 si nunca se cruza),
+    interes_5_anios y saldo_prepago (saldo al cierre del año del prepago, ya
+    descontado; 0 sin prepago). Los créditos sin prepago usan fórmula cerrada; los con prepago se
+    calculan por bloques con `calcular_tabla` para acotar la memoria.
+    """
+    credito, tasa, plazo, p_monto, p_ano = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(credito_uf, dtype=float)),
+        np.atleast_1d(np.asarray(tasa_anual, dtype=float)),
+        np.atleast_1d(np.asarray(plazo, dtype=int)),
+        np.atleast_1d(np.asarray(prepago_monto, dtype=float)),
+        np.atleast_1d(np.asarray(prepago_ano, dtype=int)),
+    )
+    credito = np.maximum(credito, 0.0)
+    n = plazo * 12
+    r = tasa_mensual(tasa)
+    cuota = dividendo(credito, tasa, plazo)
+
+    interes_total = cuota * n - credito
+    capital_total = credito.copy()
+
+    # Capital del mes k: (cuota - r·C)(1+r)^(k-1); supera al interés cuando pasa cuota/2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = 1 + np.log(cuota / (2 * (cuota - r * credito))) / np.log1p(r)
+    mes_cruce = np.where(r > 0, np.maximum(np.floor(x) + 1, 1), 1)
+    mes_cruce = np.where(np.isfinite(mes_cruce), mes_cruce, n + 1).astype(int)
+    anio = np.where((credito > 0) & (mes_cruce <= n), (mes_cruce - 1) // 12 + 1, 0)
+
+    def saldo_en(k):
+        crec = (1 + r) ** k
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.maximum(credito * crec - cuota * np.where(r > 0, (crec - 1) / r, k), 0.0)
+
+    k5 = np.minimum(n, 60)
+    interes_5 = cuota * k5 - (credito - saldo_en(k5))
+    saldo_prepago = np.where(p_ano > 0, saldo_en(np.minimum(p_ano * 12, n)), 0.0)
+
+    con_prepago = np.flatnonzero((p_monto > 0) & (p_ano >= 1) & (p_ano * 12 <= n))
+    for i in range(0, len(con_prepago), bloque):
+        idx = con_prepago[i:i + bloque]
+        tabla = calcular_tabla(credito[idx], tasa[idx], plazo[idx], p_monto[idx], p_ano[idx])
+        interes_total[idx] = tabla["interes"].sum(axis=1)
+        capital_total[idx] = tabla["capital"].sum(axis=1)
+        cruza = tabla["capital"] > tabla["interes"]
+        primero = cruza.argmax(axis=1)
+        anio[idx] = np.where(cruza.any(axis=1), tabla["anio"][primero], 0)
+        interes_5[idx] = tabla["interes"][:, :60].sum(axis=1)
+        saldo_prepago[idx] = tabla["saldo"][np.arange(len(idx)), p_ano[idx] * 12 - 1]
+
+    return {
+        "dividendo": cuota,
+        "interes_total": interes_total,
+        "capital_total": capital_total,
+        "anio_cruce": anio,
+        "interes_5_anios": interes_5,
+        "saldo_prepago": saldo_prepago,
+    }
@@ -0,0 +1,257 @@
+import argparse
+import contextlib
+
+import numpy as np
+import pandas as pd
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+import diagnostico
+from indicadores import obtener_indicadores
+from simular_lote import COLUMNAS_OPCIONALES, PERFIL_POR_DEFECTO, campos_diagnostico, simular_bloque
+from simulador import simular_escenario
+
+# --- API HTTP/JSON del simulador ---
+# Las mismas cifras que la página (dividendo, costo total y diagnóstico) para
+# otros sistemas. Un escenario se resuelve con el núcleo memoizado; los lotes
+# pasan completos por el cálculo vectorizado de `simular_lote`. Ambos corren
+# en un hilo aparte, sin bloquear el event loop. La UF sale del snapshot compartido de
+# indicadores, nunca de una consulta a mindicador.cl por request.
+#
+#   python api.py --puerto 8000          # o: uvicorn api:app --workers 4
+#
+#   POST /simular        {"precio_uf": 3045, "pie_uf": 609, "plazo": 20, "tasa_anual": 0.037}
+#   POST /simular/lote   {"escenarios": [{...}, ...], "diagnostico": true}
+#
+# Ambos aceptan "reglas": {"umbrales": {"PIE_BUENO.pie_pct": 0.25}, "desactivar": [...]}
+# para evaluar el diagnóstico con la tabla de un banco o producto. Si la regla
+# compara dos veces el mismo campo, la clave lleva el operador: "CAPRATE_BAJO.cap_rate<".
+
+REQUERIDAS = ("precio_uf", "pie_uf", "plazo", "tasa_anual")
+RESULTADOS = ("credito_uf", "dividendo_uf", "dividendo_clp", "sueldo_recomendado", "interes_total",
+              "monto_total", "anio_cruce", "interes_5_anios", "saldo_prepago")
+PERFIL_NUMERICO = ("edad", "arriendo_mensual")
+PERFIL_TEXTO = ("tipo_trabajo", "objetivo")
+MAX_LOTE = 100_000
+
+
+class ErrorEntrada(ValueError):
+    pass
+
+
+def _uf(cuerpo):
+    indicadores, origen, _ = obtener_indicadores()
+    uf = cuerpo.get("uf_clp")
+    if uf is None:
+        return float(indicadores["uf"]), origen
+    try:
+        if isinstance(uf, bool):
+            raise TypeError
+        uf = float(uf)
+    except (TypeError, ValueError):
+        raise ErrorEntrada("`uf_clp` debe ser numérico")
+    if not uf > 0:
+        raise ErrorEntrada("`uf_clp` debe ser mayor que 0")
+    return uf, "solicitud"
+
+
+def _validar(datos):
+    # `datos`: DataFrame de un lote o dict de un escenario
+    faltan = [c for c in REQUERIDAS if c not in datos]
+    if faltan:
+        raise ErrorEntrada(f"Faltan campos obligatorios: {', '.join(faltan)}")
+    try:
+        precio, pie, plazo, tasa = (np.asarray(datos[c], dtype=float) for c in REQUERIDAS)
+    except (TypeError, ValueError):
+        raise ErrorEntrada("Los campos obligatorios deben ser numéricos")
+    malos = ~((precio > 0) & (pie >= 0) & (plazo >= 1) & (plazo <= 40) & (plazo == np.round(plazo)) & (tasa >= 0))
+    if malos.any():
+        raise ErrorEntrada(f"Escenario {int(np.argmax(malos))} inválido: precio > 0, pie >= 0, "
+                           "plazo entero entre 1 y 40 y tasa_anual >= 0 (decimal, 0.037)")
+
+
+def _es_texto(valor):
+    return valor is None or isinstance(valor, str) or valor != valor
+
+
+def _escenario(e):
+    # Entradas de un escenario ya convertidas: el diagnóstico compara números, no textos como "20"
+    try:
+        x = {c: float(e[c]) for c in REQUERIDAS}
+        x["plazo"] = int(x["plazo"])
+        x.update({c: float(e.get(c, v)) for c, v in COLUMNAS_OPCIONALES.items()})
+        x["prepago_ano"] = int(x["prepago_ano"])
+        x.update({c: float(e.get(c, PERFIL_POR_DEFECTO[c])) for c in PERFIL_NUMERICO})
+    except (TypeError, ValueError):
+        raise ErrorEntrada(f"Los campos opcionales y {', '.join(PERFIL_NUMERICO)} deben ser numéricos")
+    for c in PERFIL_TEXTO:
+        x[c] = e.get(c, PERFIL_POR_DEFECTO[c])
+        if not isinstance(x[c], str):
+            raise ErrorEntrada(f"`{c}` debe ser texto")
+    return x
+
+
+def _lote(df):
+    # Mismo criterio que `_escenario`, por columnas; los vacíos quedan como NaN
+    numericas = [c for c in (*REQUERIDAS, *COLUMNAS_OPCIONALES, *PERFIL_NUMERICO) if c in df]
+    try:
+        df[numericas] = df[numericas].apply(pd.to_numeric)
+    except (TypeError, ValueError):
+        raise ErrorEntrada(f"Los campos opcionales y {', '.join(PERFIL_NUMERICO)} deben ser numéricos")
+    for c in PERFIL_TEXTO:
+        if c in df and not df[c].map(_es_texto).all():
+            raise ErrorEntrada(f"`{c}` debe ser texto")
+    return df
+
+
+def _reglas(cuerpo):
+    # Tabla de reglas del banco o producto: {"umbrales": {...}, "desactivar": [...]}
+    config = cuerpo.get("reglas")
+    if not config:
+        return diagnostico.REGLAS
+    try:
+        return diagnostico.ajustar(diagnostico.REGLAS, config.get("umbrales"), config.get("desactivar", ()))
+    except (AttributeError, TypeError, ValueError) as e:
+        raise ErrorEntrada(f"Reglas inválidas: {e}")
+
+
+def _diagnostico_uno(e, r, uf_clp, reglas):
+    campos = campos_diagnostico({**e, **r}, uf_clp)
+    mascara = diagnostico.evaluar(campos, reglas)
+    valores = {k: v.item() for k, v in campos.items()}
+    return ([regla.codigo for regla, activa in zip(reglas, mascara) if activa],
+            list(diagnostico.mensajes(valores, mascara, reglas)))
+
+
+def simular_uno(e, uf_clp, reglas=diagnostico.REGLAS):
+    _validar(e)
+    e = _escenario(e)
+    s = simular_escenario(e["precio_uf"], e["pie_uf"], e["beneficios"], e["plazo"], e["tasa_anual"],
+                          e["seguro_mensual"], e["prepago_monto"], e["prepago_ano"], uf_clp)
+    r = {
+        "credito_uf": s["credito_uf"],
+        "dividendo_uf": s["dividendo_uf"],
+        "dividendo_clp": s["dividendo_clp"],
+        "sueldo_recomendado": s["sueldo_recomendado"],
+        "interes_total": s["interes_total"],
+        "monto_total": s["monto_total_uf"],
+        "anio_cruce": s["anio_salto"] or 0,
+        "interes_5_anios": s["primeros_5_anios_interes"],
+        "saldo_prepago": s["saldo_prepago"],
+    }
+    r["codigos"], r["diagnosticos"] = _diagnostico_uno(e, r, uf_clp, reglas)
+    return r
+
+
+def simular_varios(escenarios, uf_clp, reglas=diagnostico.REGLAS):
+    """Resultados por escenario y aciertos por regla (`reglas=None` omite el diagnóstico)."""
+    if not isinstance(escenarios, list) or not escenarios:
+        raise ErrorEntrada("`escenarios` debe ser una lista no vacía")
+    if len(escenarios) > MAX_LOTE:
+        raise ErrorEntrada(f"Máximo {MAX_LOTE} escenarios por lote")
+    no_objetos = [i for i, e in enumerate(escenarios) if not isinstance(e, dict)]
+    if no_objetos:
+        raise ErrorEntrada(f"Escenario {no_objetos[0]} inválido: cada escenario debe ser un objeto JSON")
+    df = pd.DataFrame.from_records(escenarios)
+    _validar(df)
+    df = _lote(df)
+    # Campos opcionales omitidos sólo en algunos escenarios
+    df = df.fillna({c: v for c, v in COLUMNAS_OPCIONALES.items() if c in df})
+    try:
+        salida = simular_bloque(df, uf_clp)
+    except (TypeError, ValueError):
+        raise ErrorEntrada("Los campos opcionales deben ser numéricos")
+    columnas = [salida[c].tolist() for c in RESULTADOS]
+    resultados = [dict(zip(RESULTADOS, fila)) for fila in zip(*columnas)]
+    if not reglas:
+        return resultados, {}
+    # Las reglas se evalúan como máscaras sobre el lote completo; sólo los textos se arman por fila
+    salida = salida.fillna({c: v for c, v in PERFIL_POR_DEFECTO.items() if c in salida})
+    campos = campos_diagnostico(salida, uf_clp)
+    mascaras = diagnostico.evaluar(campos, reglas)
+    textos = diagnostico.codigos(mascaras, reglas)
+    for r, codigos, mensajes in zip(resultados, textos, diagnostico.mensajes_lote(campos, mascaras, reglas)):
+        r["codigos"] = codigos.split(";") if codigos else []
+        r["diagnosticos"] = mensajes
+    return resultados, diagnostico.conteos(mascaras, reglas)
+
+
+async def _cuerpo(request):
+    try:
+        cuerpo = await request.json()
+    except ValueError:
+        raise ErrorEntrada("El cuerpo debe ser JSON válido")
+    if not isinstance(cuerpo, dict):
+        raise ErrorEntrada("El cuerpo debe ser un objeto JSON")
+    return cuerpo
+
+
+async def salud(request):
+    _, origen, fecha = obtener_indicadores()
+    return JSONResponse({"estado": "ok", "origen_indicadores": origen, "fecha_indicadores": fecha})
+
+
+async def indicadores(request):
+    valores, origen, fecha = obtener_indicadores()
+    return JSONResponse({"valores": valores, "origen": origen, "fecha": fecha})
+
+
+async def simular(request):
+    cuerpo = await _cuerpo(request)
+    uf_clp, origen = _uf(cuerpo)
+    resultado = await run_in_threadpool(simular_uno, cuerpo, uf_clp, _reglas(cuerpo))
+    return JSONResponse({"uf_clp": uf_clp, "origen_uf": origen, **resultado})
+
+
+async def simular_lote(request):
+    cuerpo = await _cuerpo(request)
+    uf_clp, origen = _uf(cuerpo)
+    reglas = _reglas(cuerpo) if cuerpo.get("diagnostico", True) else None
+    resultados, conteos = await run_in_threadpool(simular_varios, cuerpo.get("escenarios"), uf_clp, reglas)
+    return JSONResponse({"uf_clp": uf_clp, "origen_uf": origen, "resultados": resultados, "conteos": conteos})
+
+
+async def estadisticas_diagnostico(request):
+    # Aciertos acumulados por regla desde que partió el proceso
+    return JSONResponse(diagnostico.estadisticas())
+
+
+async def error_entrada(request, exc):
+    return JSONResponse({"error": str(exc)}, status_code=400)
+
+
+@contextlib.asynccontextmanager
+async def ciclo_vida(app):
+    # Calienta el snapshot de indicadores antes de aceptar tráfico
+    await run_in_threadpool(obtener_indicadores)
+    yield
+
+
+app = Starlette(
+    routes=[
+        Route("/salud", salud),
+        Route("/indicadores", indicadores),
+        Route("/simular", simular, methods=["POST"]),
+        Route("/simular/lote", simular_lote, methods=["POST"]),
+        Route("/diagnostico/estadisticas", estadisticas_diagnostico),
+    ],
+    exception_handlers={ErrorEntrada: error_entrada},
+    lifespan=ciclo_vida,
+)
+
+
+def main(argv=None):
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="API HTTP/JSON del simulador hipotecario.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1, help="Procesos de uvicorn")
+    args = parser.parse_args(argv)
+    uvicorn.run("api:app", host=args.host, port=args.puerto, workers=args.workers, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,40 @@
+import math
+import time
+from datetime import datetime
+from functools import partial
+
 import streamlit as st
-import numpy as np
-import pandas as pd
-import requests
-import plotly.graph_objects as go
+
+import diagnostico
+import escenarios
+import graficos
+import instrumentacion
+import reporte_pdf
+from asequibilidad import tasa_maxima
+from cache_resultados import cache as cache_resultados
+from eventos import MODOS_PREPAGO, TIPOS as TIPOS_EVENTO, Evento
+from exportacion import (FORMATOS as FORMATOS_EXPORTACION, NIVELES as NIVELES_TABLA, numero_paginas,
+                         pagina as pagina_amortizacion)
+from historico import almacen as almacen_historico
+from indicadores import obtener_indicadores
+from sensibilidad import METRICAS as METRICAS_SENSIBILIDAD
+from simulador import (backtest_credito, clave_reporte, datos_reporte, diagnosticar, exportar_tabla,
+                       figura_anual, figura_backtest, figura_distribucion, figura_escenarios, figura_mensual,
+                       figura_montecarlo, figura_sensibilidad, guardar_escenario, ranking_estrategias,
+                       simular_con_eventos, simular_escenario, simular_montecarlo, tabla_agregada,
+                       tabla_asequibilidad_df, tabla_comparativa, tabla_escenarios)
+
+inicio_rerun = time.perf_counter()
 
 # --- Premium UX & Branding ---
 st.set_page_config(page_title="Simulador Hipotecario 🏡", layout="wide")
+
+# ?debug=1 activa el panel de rendimiento y la medición sólo en esta sesión;
+# el switch global del proceso es SIMULADOR_PERF
+if st.query_params.get("debug") == "1":
+    st.session_state["depuracion"] = True
+depuracion = instrumentacion.activo() or st.session_state.get("depuracion", False)
+seccion = partial(instrumentacion.seccion, activa=depuracion)
 st.markdown("""
 <style>
 h1 { font-family: 'Segoe UI', sans-serif; color: #2E86C1; }
@@ -58,44 +87,45 @@ with st.sidebar:
     """, unsafe_allow_html=True)
 
     st.markdown("### 📈 Indicadores Económicos")
-    try:
-        r = requests.get("https://mindicador.cl/api").json()
+    with seccion("indicadores"):
+        indicadores, origen_indicadores, fecha_indicadores = obtener_indicadores()
+    uf_clp = indicadores['uf']
+    tpm = indicadores['tpm']
+    if origen_indicadores == "defecto":
+        st.warning("⚠️ No se pudo cargar indicadores en línea. Se usan valores por defecto.")
+    else:
         st.markdown(f"""
         <div class="econ-card">
             <span class="econ-icon">💸</span>
             <div>
                 <div class="econ-title">UF</div>
-                <div class="econ-value">${r['uf']['valor']:,.2f} CLP</div>
+                <div class="econ-value">${indicadores['uf']:,.2f} CLP</div>
             </div>
         </div>
         <div class="econ-card">
             <span class="econ-icon">💵</span>
             <div>
                 <div class="econ-title">Dólar</div>
-                <div class="econ-value">${r['dolar']['valor']:,.2f} CLP</div>
+                <div class="econ-value">${indicadores['dolar']:,.2f} CLP</div>
             </div>
         </div>
         <div class="econ-card">
             <span class="econ-icon">📊</span>
             <div>
                 <div class="econ-title">IPC</div>
-                <div class="econ-value">{r['ipc']['valor']:.2f}%</div>
+                <div class="econ-value">{indicadores['ipc']:.2f}%</div>
             </div>
         </div>
         <div class="econ-card">
             <span class="econ-icon">🏦</span>
             <div>
                 <div class="econ-title">TPM</div>
-                <div class="econ-value">{r['tpm']['valor']:.2f}%</div>
+                <div class="econ-value">{indicadores['tpm']:.2f}%</div>
             </div>
         </div>
         """, unsafe_allow_html=True)
-        uf_clp = r['uf']['valor']
-        tpm = r['tpm']['valor']
-    except:
-        st.warning("⚠️ No se pudo cargar indicadores en línea. Se usan valores por defecto.")
-        uf_clp = 36000
-        tpm = 6.0
+        if origen_indicadores == "cache":
+            st.caption(f"Valores al {datetime.fromtimestamp(fecha_indicadores).strftime('%d-%m-%Y %H:%M')} (actualizando...)")
 
 # --- Inputs principales y perfil avanzado ---
 with st.expander("🧑 Datos de perfil para diagnóstico personalizado", expanded=False):
@@ -151,41 +181,22 @@ def manejar_beneficios():
 total_beneficios = manejar_beneficios()
 
 # --- Cálculos automáticos ---
-credito_uf = max(precio_uf - pie_uf - total_beneficios, 0)
-credito_clp = credito_uf * uf_clp
-tasa_mensual = (1 + tasa_anual) ** (1/12) - 1
-n_meses = plazo * 12
-if credito_uf > 0:
-    dividendo_uf = credito_uf * tasa_mensual / (1 - (1 + tasa_mensual) ** -n_meses)
-else:
-    dividendo_uf = 0
-dividendo_clp = dividendo_uf * uf_clp + seguro_mensual
-sueldo_recomendado = dividendo_clp / 0.25
-
-saldo = credito_uf
-interes_total = capital_total = 0
-tabla = []
-anios = {}
-anio_salto = None
-
-for mes in range(1, n_meses + 1):
-    interes = saldo * tasa_mensual
-    capital = dividendo_uf - interes
-    if prepago and mes == prepago_ano * 12:
-        saldo -= prepago_monto
-    saldo -= capital
-    interes_total += interes
-    capital_total += capital
-    anio = mes // 12 + 1
-    anios.setdefault(anio, {"cap": 0, "int": 0})
-    anios[anio]["cap"] += capital
-    anios[anio]["int"] += interes
-    tabla.append([mes, anio, capital, interes, saldo])
-    if not anio_salto and capital > interes:
-        anio_salto = anio
-
-monto_total_uf = capital_total + interes_total
-monto_total_clp = monto_total_uf * uf_clp
+with seccion("calculo"):
+    escenario = simular_escenario(precio_uf, pie_uf, total_beneficios, plazo, tasa_anual, seguro_mensual,
+                                  prepago_monto, prepago_ano, uf_clp)
+    credito_uf = escenario["credito_uf"]
+    credito_clp = escenario["credito_clp"]
+    n_meses = plazo * 12
+    dividendo_uf = escenario["dividendo_uf"]
+    dividendo_clp = escenario["dividendo_clp"]
+    sueldo_recomendado = escenario["sueldo_recomendado"]
+
+    interes_total = escenario["interes_total"]
+    capital_total = escenario["capital_total"]
+    anio_salto = escenario["anio_salto"]
+
+    monto_total_uf = escenario["monto_total_uf"]
+    monto_total_clp = escenario["monto_total_clp"]
 
 # CAP RATE: tasa de capitalización
 arriendo_mensual = st.number_input("🏠 Arriendo mensual estimado (CLP)", value=0, step=10000)
@@ -207,193 +218,106 @@ with c2:
     st.metric("🏡 Cap Rate estimado", f"{cap_rate:.2f} %")
 
 # --- Comparativa rápida de otros plazos ---
-plazos_comunes = [15, 20, 25, 30]
-comparacion = []
-for p in plazos_comunes:
-    meses_alt = p * 12
-    tasa_mensual_alt = (1 + tasa_anual) ** (1/12) - 1
-    if credito_uf > 0:
-        dividendo_uf_alt = credito_uf * tasa_mensual_alt / (1 - (1 + tasa_mensual_alt) ** -meses_alt)
-    else:
-        dividendo_uf_alt = 0
-    dividendo_clp_alt = dividendo_uf_alt * uf_clp + seguro_mensual
-    renta_sugerida_alt = dividendo_clp_alt / 0.25
-    total_pagar_uf = dividendo_uf_alt * meses_alt
-    total_pagar_clp = dividendo_clp_alt * meses_alt
-    interes_total_uf = total_pagar_uf - credito_uf
-    interes_total_clp = interes_total_uf * uf_clp
-    monto_total_con_pie_uf = pie_uf + total_pagar_uf
-    monto_total_con_pie_clp = monto_total_con_pie_uf * uf_clp
-    comparacion.append([
-        f"{p} años",
-        f"{tasa_anual*100:.2f} %",
-        f"{dividendo_uf_alt:,.2f} UF ~ ${dividendo_clp_alt:,.0f}",
-        f"{renta_sugerida_alt/uf_clp:,.2f} UF ~ ${renta_sugerida_alt:,.0f}",
-        f"{total_pagar_uf:,.2f} UF ~ ${total_pagar_clp:,.0f}",
-        f"{interes_total_uf:,.2f} UF ~ ${interes_total_clp:,.0f}",
-        f"{monto_total_con_pie_uf:,.2f} UF ~ ${monto_total_con_pie_clp:,.0f}",
-        "✔️ Simulado" if p == plazo else ""
-    ])
-df_comp = pd.DataFrame(comparacion, columns=[
-    "↑ Plazo",
-    "Tasa (%)",
-    "Dividendo mensual (UF ~ CLP)",
-    "Renta sugerida (UF ~ CLP)",
-    "Monto total: credito+interes (UF ~ CLP)",
-    "Intereses totales (UF ~ CLP)",
-    "Monto total: credito+interés+Pie (UF ~ CLP)",
-    "Simulado"
-])
-def highlight_simulado(row):
-    return ['background-color: #D0E9FF; font-weight: bold;' if row['Simulado'] else '' for _ in row]
-df_styled = df_comp.style.apply(highlight_simulado, axis=1)
-st.markdown("### 📊 Comparativa rápida: distintos plazos con misma tasa")
-st.dataframe(df_styled, use_container_width=True)
-st.caption(f"*Comparativa estimada con tasa {tasa_anual*100:.2f}% y UF = ${uf_clp:,.2f} al {pd.Timestamp.now().strftime('%d-%m-%Y')}*")
+with seccion("comparativa"):
+    df_styled = tabla_comparativa(credito_uf, tasa_anual, pie_uf, seguro_mensual, uf_clp, plazo)
+    st.markdown("### 📊 Comparativa rápida: distintos plazos con misma tasa")
+    st.dataframe(df_styled, use_container_width=True)
+    st.caption(f"*Comparativa estimada con tasa {tasa_anual*100:.2f}% y UF = ${uf_clp:,.2f} al {datetime.now().strftime('%d-%m-%Y')}*")
+
+# --- Sensibilidad: plazo × tasa × pie ---
+with seccion("sensibilidad"), st.expander("🗺️ Mapa de sensibilidad: plazo × tasa × pie"):
+    col_s1, col_s2 = st.columns(2)
+    with col_s1:
+        metrica_sens = st.selectbox("Métrica", list(METRICAS_SENSIBILIDAD), format_func=METRICAS_SENSIBILIDAD.get)
+    with col_s2:
+        pie_sens = st.slider("Pie (%)", 10, 50, int(min(max(round(pie_uf / precio_uf * 100), 10), 50))) / 100
+    st.plotly_chart(figura_sensibilidad(precio_uf, total_beneficios, seguro_mensual, uf_clp, pie_sens, metrica_sens), use_container_width=True)
+    st.caption("Plazos de 1 a 30 años, tasas de 1% a 10% cada 0,05% y pie de 10% a 50%.")
 
 # --- Gráficos avanzados ---
-fig1 = go.Figure(data=[go.Pie(
-    labels=["Pie Inicial", "Capital", "Interés"],
-    values=[pie_uf, capital_total, interes_total],
-    hole=0.4,
-    marker=dict(colors=["#2980B9", "#1ABC9C", "#F39C12"]),
-    customdata=[round(pie_uf * uf_clp), round(capital_total * uf_clp), round(interes_total * uf_clp)],
-    hovertemplate="<b>%{label}</b><br>Monto: %{value:.2f} UF<br>~$%{customdata:,} CLP<extra></extra>"
-)])
-fig1.update_layout(title="Distribución total del pago (incluyendo Pie Inicial)", height=400, showlegend=True)
-st.plotly_chart(fig1, use_container_width=True)
-
-years = list(anios.keys())
-fig2 = go.Figure()
-fig2.add_trace(go.Scatter(
-    x=years,
-    y=[anios[y]["cap"]+anios[y]["int"] for y in years],
-    name="Cuota Total (UF)",
-    mode="lines+markers",
-    line=dict(color="royalblue"),
-    hovertemplate="Año %{x}<br>Cuota Total: %{y:.2f} UF"
-))
-fig2.add_trace(go.Bar(
-    x=years,
-    y=[anios[y]["int"] for y in years],
-    name="Interés",
-    marker_color="orange",
-    customdata=[round(anios[y]["int"] * uf_clp) for y in years],
-    hovertemplate="<b>Año %{x}</b><br>Interés: %{y:.2f} UF<br>(~$%{customdata:,} CLP)<extra></extra>"
-))
-fig2.add_trace(go.Bar(
-    x=years,
-    y=[anios[y]["cap"] for y in years],
-    name="Capital",
-    marker_color="teal",
-    customdata=[round(anios[y]["cap"] * uf_clp) for y in years],
-    hovertemplate="<b>Año %{x}</b><br>Capital: %{y:.2f} UF<br>(~$%{customdata:,} CLP)<extra></extra>"
-))
-fig2.update_layout(barmode='stack', title="📉 Evolución anual: Interés vs Capital", xaxis_title="Año", yaxis_title="UF", height=450)
-st.plotly_chart(fig2, use_container_width=True)
+with seccion("graficos"):
+    fig1 = figura_distribucion(pie_uf, capital_total, interes_total, uf_clp)
+    st.plotly_chart(fig1, use_container_width=True)
 
-# --- Diagnóstico Financiero Inteligente (ultra enriquecido) ---
-st.subheader("💡 Diagnóstico Financiero Inteligente")
-diagnosticos = []
-pie_pct = pie_uf / precio_uf if precio_uf > 0 else 0
-ratio_total = monto_total_uf / credito_uf if credito_uf > 0 else float('inf')
-
-# Tasa de interés
-if tasa_anual < 0.035:
-    diagnosticos.append("🔵 Excelente tasa. Lograste condiciones muy competitivas.")
-elif tasa_anual <= 0.045:
-    diagnosticos.append("🟢 Buena tasa. Estás dentro del rango óptimo actual.")
-elif tasa_anual <= 0.055:
-    diagnosticos.append("🟡 Tasa aceptable, pero podrías buscar mejores opciones.")
-else:
-    diagnosticos.append("🔴 Tasa alta. Evalúa cotizar con otros bancos o esperar mejores condiciones.")
-
-# Pie inicial
-if pie_pct >= 0.25:
-    diagnosticos.append("🔵 Excelente pie inicial. Reduciste el monto y los intereses del crédito.")
-elif pie_pct >= 0.20:
-    diagnosticos.append("🟢 Buen pie inicial. Cumples con lo recomendado por la banca.")
-elif pie_pct >= 0.15:
-    diagnosticos.append("🟡 Pie aceptable. Considera aumentarlo si puedes.")
-else:
-    diagnosticos.append("🔴 Pie muy bajo. Podrías enfrentar mayores intereses y restricciones.")
-
-# Plazo
-if plazo > 25:
-    diagnosticos.append("🟡 Plazo largo. Cuotas más bajas, pero pagas más intereses.")
-elif plazo < 15:
-    diagnosticos.append("🟢 Plazo corto. Ahorro en intereses, pero cuota más exigente.")
-
-# Relación total pagado / crédito solicitado
-if ratio_total > 2.0:
-    diagnosticos.append("🔴 Estás pagando más del doble del crédito en total. Revisa la tasa y plazo.")
-elif ratio_total > 1.7:
-    diagnosticos.append("🟡 Costo total elevado. Ajustar plazo o tasa podría ayudar.")
-else:
-    diagnosticos.append("🟢 Costo total razonable. Bien controlado.")
+    fig2 = figura_anual(credito_uf, tasa_anual, plazo, prepago_monto, prepago_ano, uf_clp)
+    st.plotly_chart(fig2, use_container_width=True)
 
-# Relación dividendo - ingreso recomendado
-if sueldo_recomendado > 2_000_000:
-    diagnosticos.append("🟡 El dividendo requiere un ingreso mensual alto. Evalúa reducir el monto del crédito o aumentar el pie.")
-elif sueldo_recomendado < 1_200_000:
-    diagnosticos.append("🟢 Buena relación cuota / ingreso estimado. Deberías poder cumplir con holgura.")
+    fig3 = figura_mensual(credito_uf, tasa_anual, plazo, prepago_monto, prepago_ano)
+    st.plotly_chart(fig3, use_container_width=True)
 
-# Detalle de amortización inteligente
-if anio_salto:
-    diagnosticos.append(f"🟢 A partir del año {anio_salto} pagas más capital que interés en cada cuota. La deuda se reduce más rápido.")
-else:
-    diagnosticos.append("🟡 Durante todo el plazo, el pago de interés supera el capital. Considera reducir plazo o negociar mejor tasa.")
-
-primeros_5_anios_interes = sum(anios[a]["int"] for a in range(1, min(6, plazo+1)))
-diagnosticos.append(
-    f"En los primeros 5 años pagarás aproximadamente {primeros_5_anios_interes:.2f} UF (~${primeros_5_anios_interes*uf_clp:,.0f} CLP) solo en intereses."
-)
-
-if prepago and prepago_monto > 0:
-    saldo_prepago = tabla[prepago_ano*12-1][4] if prepago_ano*12-1 < len(tabla) else 0
-    diagnosticos.append(
-        f"Prepago de {prepago_monto:.2f} UF en año {prepago_ano}: reduce el saldo a {saldo_prepago:.2f} UF y disminuye intereses futuros."
+# --- Diagnóstico Financiero Inteligente (ultra enriquecido) ---
+st.subheader("💡 Diagnóstico Financiero Inteligente")
+with seccion("diagnostico"):
+    pie_pct = pie_uf / precio_uf if precio_uf > 0 else 0
+    ratio_total = monto_total_uf / credito_uf if credito_uf > 0 else float('inf')
+    primeros_5_anios_interes = escenario["primeros_5_anios_interes"]
+    saldo_prepago = escenario["saldo_prepago"]
+    diagnosticos = diagnosticar(
+        tasa_anual, pie_pct, plazo, ratio_total, sueldo_recomendado, anio_salto,
+        primeros_5_anios_interes, uf_clp, prepago_monto, prepago_ano, saldo_prepago,
+        cap_rate, total_beneficios, objetivo, edad, tipo_trabajo,
     )
 
-# Cap Rate análisis
-if cap_rate > 0:
-    if cap_rate < 4:
-        diagnosticos.append("⚠️ El CAP RATE es bajo para inversión. Evalúa opciones con mejor rentabilidad.")
-    elif cap_rate > 6:
-        diagnosticos.append("🟢 Buen CAP RATE. El arriendo cubre bien la cuota y el crédito.")
-
-# Beneficios
-if total_beneficios > 0:
-    diagnosticos.append(f"🟢 Has aplicado beneficios/subsidios por un total de {total_beneficios:.2f} UF. Esto reduce el monto solicitado y los intereses pagados.")
-
-# Diagnóstico personalizado por perfil
-if objetivo == "Inversión" and cap_rate < 5:
-    diagnosticos.append("⚠️ Como tu objetivo es inversión, considera buscar propiedades con mejor rentabilidad (Cap Rate > 5%).")
-if edad < 25 and plazo > 25:
-    diagnosticos.append("🟢 Al ser joven, puedes optar por plazos largos, pero revisa el costo total.")
-if tipo_trabajo == "Independiente" and pie_pct < 0.20:
-    diagnosticos.append("🟡 Si eres independiente, los bancos suelen exigir mayor pie inicial.")
-
-st.markdown(
-    f"""
-    <div style="background-color:#F7F9F9; border-left: 6px solid #3498db; padding: 18px; margin: 22px 0; border-radius: 10px;">
-    <ul>
-    {''.join(f'<li>{d}</li>' for d in diagnosticos)}
-    </ul>
-    </div>
-    """, unsafe_allow_html=True
-)
+    st.markdown(
+        f"""
+        <div style="background-color:#F7F9F9; border-left: 6px solid #3498db; padding: 18px; margin: 22px 0; border-radius: 10px;">
+        <ul>
+        {''.join(f'<li>{d}</li>' for d in diagnosticos)}
+        </ul>
+        </div>
+        """, unsafe_allow_html=True
+    )
 
 # --- Tabla de amortización y exportación ---
-df = pd.DataFrame(tabla, columns=["Mes", "Año", "Capital Pagado UF", "Interés Pagado UF", "Saldo Restante UF"])
-with st.expander("📅 Ver tabla de amortización"):
-    st.dataframe(df.style.format({
+with seccion("tabla_amortizacion"), st.expander("📅 Ver tabla de amortización"):
+    col_t1, col_t2, col_t3 = st.columns(3)
+    with col_t1:
+        nivel_tabla = st.selectbox("Agrupar por", list(NIVELES_TABLA), format_func=NIVELES_TABLA.get)
+    with col_t2:
+        filas_pagina = st.selectbox("Filas por página", [12, 24, 60, 120], index=1)
+    agregada = tabla_agregada(credito_uf, tasa_anual, plazo, prepago_monto, prepago_ano, nivel_tabla)
+    with col_t3:
+        n_paginas = numero_paginas(agregada, filas_pagina)
+        pagina_tabla = st.number_input(f"Página (de {n_paginas})", min_value=1, max_value=n_paginas, value=1)
+    st.dataframe(pagina_amortizacion(agregada, nivel_tabla, pagina_tabla, filas_pagina, uf_clp).style.format({
         "Capital Pagado UF": "{:.2f}",
         "Interés Pagado UF": "{:.2f}",
-        "Saldo Restante UF": "{:.2f}"
-    }), height=400)
-    st.download_button("📥 Descargar tabla CSV", data=df.to_csv(index=False), file_name="amortizacion.csv")
-    # Aquí podrías agregar exportación a PDF usando pdfkit o reportlab.
+        "Saldo Restante UF": "{:.2f}",
+        "Saldo Restante CLP": "${:,.0f}",
+    }), hide_index=True)
+    col_d1, col_d2, col_d3 = st.columns(3)
+    for col_d, formato in zip((col_d1, col_d2, col_d3), FORMATOS_EXPORTACION):
+        mime, nombre = FORMATOS_EXPORTACION[formato]
+        with col_d:
+            st.download_button(
+                f"📥 Descargar {formato.upper()}", file_name=nombre, mime=mime, on_click="ignore",
+                data=partial(exportar_tabla, credito_uf, tasa_anual, plazo, prepago_monto, prepago_ano, uf_clp, formato),
+            )
+
+    # Reporte PDF: se genera en segundo plano y queda en caché por escenario
+    args_reporte = (precio_uf, pie_uf, total_beneficios, plazo, tasa_anual, seguro_mensual,
+                    prepago_monto, prepago_ano, uf_clp, cap_rate, diagnosticos)
+    k_reporte = clave_reporte(*args_reporte)
+    estado_reporte = reporte_pdf.estado(k_reporte)[0]
+
+    @st.fragment(run_every=0.5 if estado_reporte == "en_curso" else None)
+    def seccion_reporte():
+        estado, valor = reporte_pdf.estado(k_reporte)
+        if estado == "listo":
+            if estado_reporte == "en_curso":
+                st.rerun()  # termina el sondeo
+            st.download_button("📄 Descargar reporte PDF", data=valor, file_name="reporte_hipotecario.pdf",
+                               mime="application/pdf", on_click="ignore")
+        elif estado == "en_curso":
+            st.progress(valor, text="Generando reporte PDF…")
+        else:
+            if estado == "error":
+                st.error(f"No se pudo generar el reporte: {valor}")
+            if st.button("📄 Generar reporte PDF"):
+                reporte_pdf.solicitar(k_reporte, partial(datos_reporte, *args_reporte))
+                st.rerun()
+
+    seccion_reporte()
 
 st.markdown("---")
 
@@ -465,6 +389,147 @@ else:
         unsafe_allow_html=True
     )
 
+# --- Asequibilidad: cálculo inverso desde el ingreso ---
+with seccion("asequibilidad"), st.expander("🧮 ¿Cuánto puedo comprar con este ingreso?"):
+    st.markdown(f"Precio y crédito máximos para que el dividendo (con seguro) no supere el 25% de {ingreso_label}, "
+                f"con tasa {tasa_anual*100:.2f}% y pie de {pie_uf/precio_uf:.0%}.")
+    st.dataframe(tabla_asequibilidad_df(ingreso_usado, tasa_anual, uf_clp, seguro_mensual, pie_uf / precio_uf, total_beneficios),
+                 use_container_width=True, hide_index=True)
+    tasa_limite = float(tasa_maxima(credito_uf, plazo, ingreso_usado, uf_clp, seguro_mensual))
+    if math.isnan(tasa_limite):
+        st.warning("Con este ingreso el crédito no es asequible a ninguna tasa en el plazo elegido.")
+    else:
+        st.metric(f"Tasa máxima asequible a {plazo} años para este crédito", f"{tasa_limite*100:.2f} %")
+
+# --- Prepagos múltiples y tasa mixta/variable ---
+with seccion("eventos"), st.expander("🔁 Prepagos múltiples, tasa mixta y cambios de seguro"):
+    st.caption("Cada evento se aplica al cierre del año indicado. Prepago: monto en UF; tasa: % anual; seguro: CLP mensual.")
+    eventos_editados = st.data_editor(
+        [{"Año": 5, "Tipo": "prepago", "Valor": 100.0, "Modo": "plazo"}],
+        num_rows="dynamic", key="eventos_credito", use_container_width=True,
+        column_config={
+            "Año": st.column_config.NumberColumn(min_value=1, max_value=plazo, step=1),
+            "Tipo": st.column_config.SelectboxColumn(options=list(TIPOS_EVENTO)),
+            "Valor": st.column_config.NumberColumn(min_value=0.0),
+            "Modo": st.column_config.SelectboxColumn(options=list(MODOS_PREPAGO)),
+        },
+    )
+    lista_eventos = tuple(
+        Evento(int(e["Año"]) * 12, e["Tipo"], e["Valor"] / 100 if e["Tipo"] == "tasa" else e["Valor"], e["Modo"] or "plazo")
+        for e in eventos_editados
+        if e.get("Año") and e.get("Tipo") and e.get("Valor") is not None
+    )
+    if credito_uf > 0:
+        res_eventos = simular_con_eventos(credito_uf, tasa_anual, plazo, lista_eventos, seguro_mensual)
+        c_ev1, c_ev2, c_ev3 = st.columns(3)
+        c_ev1.metric("Intereses totales", f"{res_eventos['interes_total']:,.2f} UF",
+                     f"{res_eventos['interes_total'] - interes_total:,.2f} UF vs. simulación base", delta_color="inverse")
+        c_ev2.metric("Término del crédito", f"Mes {res_eventos['mes_termino']}", f"{res_eventos['mes_termino'] - n_meses} meses", delta_color="inverse")
+        c_ev3.metric("Prepagos aplicados", f"{res_eventos['prepagos_total']:,.2f} UF")
+        st.dataframe(ranking_estrategias(credito_uf, tasa_anual, plazo, lista_eventos, seguro_mensual).style.format({
+            "Intereses totales UF": "{:,.2f}",
+            "Prepagos UF": "{:,.2f}",
+        }), hide_index=True, use_container_width=True)
+
+# --- Escenarios de inflación (Monte Carlo) ---
+with seccion("montecarlo"), st.expander("🎲 Escenarios de inflación y tasa (Monte Carlo)"):
+    col_mc1, col_mc2, col_mc3 = st.columns(3)
+    with col_mc1:
+        vol_inflacion = st.number_input("Volatilidad inflación anual (%)", value=1.0, step=0.1, min_value=0.0) / 100
+    with col_mc2:
+        n_trayectorias = st.select_slider("Trayectorias", options=[1_000, 5_000, 10_000, 20_000], value=10_000)
+    with col_mc3:
+        semilla = st.number_input("Semilla", value=42, step=1)
+    tasa_variable = st.checkbox("Simular tasa variable (reajuste anual)")
+    if st.checkbox("Ejecutar simulación") and credito_uf > 0:
+        args_mc = (credito_uf, tasa_anual, plazo, uf_clp, seguro_mensual)
+        opciones_mc = dict(inflacion=inflacion, volatilidad=vol_inflacion, n_trayectorias=n_trayectorias,
+                           semilla=int(semilla), tasa_variable=tasa_variable,
+                           prepago_monto=prepago_monto, prepago_ano=prepago_ano)
+        mc = simular_montecarlo(*args_mc, **opciones_mc)
+        p5, p50, p95 = mc["total_clp"]
+        c_mc1, c_mc2, c_mc3 = st.columns(3)
+        c_mc1.metric("Total pagado P5", f"${p5:,.0f} CLP")
+        c_mc2.metric("Total pagado P50", f"${p50:,.0f} CLP")
+        c_mc3.metric("Total pagado P95", f"${p95:,.0f} CLP")
+        st.plotly_chart(figura_montecarlo(*args_mc, **opciones_mc), use_container_width=True)
+        # La carga se calcula aquí para no re-simular al cambiar el ingreso
+        carga_p50, carga_p95 = mc["dividendo_clp"][1].max() / ingreso_usado, mc["dividendo_clp"][2].max() / ingreso_usado
+        st.caption(f"Carga máxima del dividendo sobre {ingreso_label}: P50 {carga_p50:.1%} · P95 {carga_p95:.1%} (ingreso constante).")
+
+# --- Back-test con UF histórica ---
+with seccion("backtest"), st.expander("🕰️ ¿Cuánto habría costado este crédito con la UF real?"):
+    historia = almacen_historico()
+    desde_historia, hasta_historia = historia.rango("uf")
+    fecha_backtest = st.date_input(
+        "Fecha de firma del crédito", value=datetime(2015, 1, 1).date(),
+        min_value=desde_historia.astype(object), max_value=datetime.now().date(),
+    )
+    if credito_uf > 0:
+        args_backtest = (credito_uf, tasa_anual, plazo, prepago_monto, prepago_ano, fecha_backtest.isoformat(),
+                         seguro_mensual, inflacion)
+        bt = backtest_credito(*args_backtest)
+        c_bt1, c_bt2, c_bt3 = st.columns(3)
+        c_bt1.metric("Total pagado en CLP", f"${bt['total_clp']:,.0f}",
+                     f"${bt['total_clp'] - bt['total_clp_uf_fija']:,.0f} por reajuste de la UF", delta_color="inverse")
+        c_bt2.metric("UF a la firma" if fecha_backtest <= hasta_historia.astype(object) else "UF a la firma (proyectada)",
+                     f"${bt['uf_inicio']:,.2f}",
+                     None if math.isnan(bt["tpm_inicio"]) else f"TPM {bt['tpm_inicio']:.2f}%", delta_color="off")
+        c_bt3.metric("IPC acumulado en el período observado", f"{bt.get('ipc_acumulado', float('nan')):.1%}")
+        st.plotly_chart(figura_backtest(*args_backtest), use_container_width=True)
+        st.caption(f"UF observada hasta {hasta_historia}; {int((~bt['observado']).sum())} cuotas posteriores "
+                   f"proyectadas con inflación de {inflacion:.1%} anual.")
+    if historia.indice.get("fuente") == "respaldo":
+        st.caption("⚠️ Series aproximadas de respaldo. Para datos oficiales ejecuta `python historico.py ingerir`.")
+
+# --- Escenarios guardados y comparación ---
+with seccion("escenarios"), st.expander("🗂️ Escenarios guardados: comparar bancos u ofertas"):
+    # Cada sesión ve sólo sus escenarios; el token en la URL permite volver a abrirlos
+    if "espacio_escenarios" not in st.session_state:
+        dueno = st.query_params.get("espacio")
+        if not escenarios.dueno_valido(dueno):
+            dueno = escenarios.nuevo_dueno()
+            st.query_params["espacio"] = dueno
+        st.session_state["espacio_escenarios"] = escenarios.espacio(dueno)
+    espacio = st.session_state["espacio_escenarios"]
+    col_e1, col_e2 = st.columns([0.7, 0.3])
+    with col_e1:
+        nombre_escenario = st.text_input("Nombre del escenario", placeholder="Ej.: Banco A, 20 años")
+    with col_e2:
+        if st.button("💾 Guardar escenario actual", disabled=not nombre_escenario.strip()):
+            guardar_escenario(espacio, nombre_escenario.strip(), precio_uf, pie_uf, total_beneficios, plazo,
+                              tasa_anual, seguro_mensual, prepago_monto, prepago_ano, uf_clp)
+            st.success(f"Escenario «{nombre_escenario.strip()}» guardado.")
+    if len(espacio):
+        elegidos = st.multiselect("Escenarios a comparar (el primero es la base de las diferencias)",
+                                  espacio.nombres, default=espacio.nombres[-4:])
+        elegidos = tuple(n for n in elegidos if n in espacio)
+        if elegidos:
+            st.dataframe(tabla_escenarios(espacio, espacio.version, elegidos).style.format({
+                "Tasa %": "{:.2f}",
+                "Crédito UF": "{:,.2f}",
+                "Dividendo UF": "{:,.2f}",
+                "Dividendo CLP": "${:,.0f}",
+                "Intereses totales UF": "{:,.2f}",
+                "Total a pagar UF": "{:,.2f}",
+                "Sueldo requerido CLP": "${:,.0f}",
+                "Mes de término": "{:.0f}",
+                "Δ Dividendo CLP": "{:+,.0f}",
+                "Δ Intereses totales UF": "{:+,.2f}",
+                "Δ Total a pagar UF": "{:+,.2f}",
+            }), hide_index=True, use_container_width=True)
+            st.plotly_chart(figura_escenarios(espacio, espacio.version, elegidos), use_container_width=True)
+        col_e3, col_e4 = st.columns([0.7, 0.3])
+        with col_e3:
+            a_eliminar = st.selectbox("Eliminar escenario", espacio.nombres)
+        with col_e4:
+            if st.button("🗑️ Eliminar"):
+                espacio.eliminar(a_eliminar)
+                st.rerun()
+    else:
+        st.caption("Aún no hay escenarios guardados. Ponle un nombre al escenario actual y guárdalo para compararlo.")
+    st.caption("Tus escenarios son privados: guarda la dirección de esta página para volver a abrirlos.")
+
 # --- FAQ y ayuda dinámica ---
 with st.expander("❓ Preguntas frecuentes y ayuda"):
     st.markdown("""
@@ -472,10 +537,45 @@ with st.expander("❓ Preguntas frecuentes y ayuda"):
     - **¿Qué significa el pie inicial?** Es el monto que aportas de entrada. Más pie = menos crédito y menos intereses.
     - **¿Qué es el Cap Rate?** Rentabilidad estimada de arriendo sobre el valor del inmueble.
     - **¿Puedo simular prepago?** Sí, agrega el monto y año para ver el impacto en saldo y en intereses pagados.
-    - **¿Puedo descargar la tabla?** Sí, puedes exportar en CSV y próximamente en PDF.
+    - **¿Puedo descargar la tabla?** Sí, puedes exportarla en CSV, Parquet o Excel, y descargar un reporte completo en PDF.
     """)
     st.info("¿Tienes dudas? ¡Escríbenos y te ayudamos!")
 
 # --- Branding final y contacto ---
 st.markdown("---")
 st.markdown("<div style='text-align:center;'>Desarrollado por Adolfoignaciodg · Simulador premium para el mercado chileno 🇨🇱</div>", unsafe_allow_html=True)
+
+# --- Panel de rendimiento (opcional: SIMULADOR_PERF=1 o ?debug=1) ---
+if depuracion:
+    instrumentacion.registrar("rerun", time.perf_counter() - inicio_rerun)
+    with st.sidebar.expander("⏱️ Rendimiento por sección"):
+        perf = instrumentacion.resumen()
+        st.dataframe(
+            [{"Sección": n, "n": d["n"], "p50 ms": d["p50"], "p95 ms": d["p95"], "p99 ms": d["p99"]}
+             for n, d in sorted(perf.items(), key=lambda x: -x[1]["p95"])],
+            hide_index=True, use_container_width=True,
+        )
+        stats_cache = cache_resultados.estadisticas()
+        st.caption(
+            f"Caché compartida: {stats_cache['entradas']} escenarios, {stats_cache['bytes'] / 1024**2:.1f} de "
+            f"{stats_cache['presupuesto_bytes'] / 1024**2:.0f} MB, aciertos {stats_cache['tasa_aciertos']:.0%} "
+            f"({stats_cache['aciertos']}/{stats_cache['aciertos'] + stats_cache['fallos']}), desalojos {stats_cache['desalojos']}"
+        )
+        pesos = graficos.tamanos()
+        if pesos:
+            st.dataframe(
+                [{"Gráfico": n, "KB": round(d["bytes"] / 1024, 1), "Puntos": d["puntos"]} for n, d in sorted(pesos.items())],
+                hide_index=True, use_container_width=True,
+            )
+            st.caption(f"Presupuesto por gráfico: {graficos.PRESUPUESTO_BYTES / 1024:.0f} KB")
+        aciertos_reglas = diagnostico.estadisticas()
+        if aciertos_reglas:
+            st.dataframe(
+                [{"Regla de diagnóstico": c, "Aciertos": n} for c, n in sorted(aciertos_reglas.items(), key=lambda x: -x[1])],
+                hide_index=True, use_container_width=True,
+            )
+        st.download_button("JSON", instrumentacion.exportar_json(), file_name="rendimiento.json", on_click="ignore")
+        st.download_button("Prometheus", instrumentacion.exportar_prometheus(), file_name="rendimiento.prom", on_click="ignore")
+        if st.button("Reiniciar métricas"):
+            instrumentacion.limpiar()
+            diagnostico.limpiar()
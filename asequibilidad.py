@@ -0,0 +1,79 @@
+import numpy as np
+
+from amortizacion import dividendo, tasa_mensual
+
+# --- Solver de asequibilidad ---
+# Camino inverso al simulador: dado un ingreso, ¿cuál es el crédito y el
+# precio máximo por plazo, y qué tasa hace asequible una propiedad?
+# Todas las funciones aceptan arreglos y hacen broadcast entre sí.
+#
+# El dividendo se fija al originar el crédito, así que un prepago no cambia
+# el máximo asequible; los beneficios y el pie entran en forma cerrada.
+
+CARGA_MAXIMA = 0.25
+
+
+def dividendo_maximo_uf(ingreso_clp, uf_clp, seguro_mensual=0.0, carga=CARGA_MAXIMA):
+    # Dividendo en UF que deja la cuota total (con seguro) en `carga` del ingreso
+    return np.maximum((np.asarray(ingreso_clp, dtype=float) * carga - seguro_mensual) / uf_clp, 0.0)
+
+
+def credito_maximo(ingreso_clp, tasa_anual, plazo, uf_clp, seguro_mensual=0.0, carga=CARGA_MAXIMA):
+    # Inversa cerrada de la anualidad: C = D · (1 - (1+r)^-n) / r
+    cuota = dividendo_maximo_uf(ingreso_clp, uf_clp, seguro_mensual, carga)
+    r = tasa_mensual(tasa_anual)
+    n = np.asarray(plazo) * 12
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(r > 0, cuota * (1 - (1 + r) ** -n) / r, cuota * n)
+
+
+def precio_maximo(ingreso_clp, tasa_anual, plazo, uf_clp, seguro_mensual=0.0, pie_pct=None, pie_uf=0.0,
+                  beneficios=0.0, carga=CARGA_MAXIMA):
+    """Precio máximo en UF.
+
+    Con `pie_pct` el pie es proporcional al precio; si no, se usa `pie_uf`
+    como monto fijo. Los beneficios se suman al poder de compra.
+    """
+    credito = credito_maximo(ingreso_clp, tasa_anual, plazo, uf_clp, seguro_mensual, carga)
+    if pie_pct is not None:
+        return (credito + beneficios) / (1 - np.asarray(pie_pct, dtype=float))
+    return credito + pie_uf + beneficios
+
+
+def tasa_maxima(credito_uf, plazo, ingreso_clp, uf_clp, seguro_mensual=0.0, carga=CARGA_MAXIMA,
+                tasa_tope=0.5, iteraciones=60):
+    """Mayor tasa anual con la que el crédito sigue siendo asequible.
+
+    Bisección vectorizada: el dividendo crece con la tasa. Devuelve NaN donde
+    ni con tasa 0 se alcanza, y `tasa_tope` si incluso esa tasa es asequible.
+    """
+    credito, plazo, cuota = np.broadcast_arrays(
+        np.asarray(credito_uf, dtype=float),
+        np.asarray(plazo),
+        dividendo_maximo_uf(ingreso_clp, uf_clp, seguro_mensual, carga),
+    )
+    bajo = np.zeros(credito.shape)
+    alto = np.full(credito.shape, float(tasa_tope))
+    for _ in range(iteraciones):
+        medio = (bajo + alto) / 2
+        asequible = dividendo(credito, medio, plazo) <= cuota
+        bajo = np.where(asequible, medio, bajo)
+        alto = np.where(asequible, alto, medio)
+    tasa = np.where(dividendo(credito, alto, plazo) <= cuota, alto, bajo)
+    return np.where(dividendo(credito, 0.0, plazo) <= cuota, tasa, np.nan)
+
+
+def tabla_asequibilidad(ingresos_clp, plazos, tasa_anual, uf_clp, seguro_mensual=0.0, pie_pct=0.2,
+                        beneficios=0.0, carga=CARGA_MAXIMA):
+    # Grilla ingresos × plazos en una sola llamada
+    ingresos = np.asarray(ingresos_clp, dtype=float)[:, None]
+    plazos = np.asarray(plazos)[None, :]
+    credito = credito_maximo(ingresos, tasa_anual, plazos, uf_clp, seguro_mensual, carga)
+    precio = (credito + beneficios) / (1 - pie_pct)
+    return {
+        "ingreso": ingresos[:, 0],
+        "plazo": plazos[0],
+        "credito_uf": credito,
+        "precio_uf": precio,
+        "pie_uf": precio * pie_pct,
+    }
@@ -0,0 +1,154 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import cache_resultados  # noqa: E402
+import exportacion  # noqa: E402
+import indicadores  # noqa: E402
+import simulador  # noqa: E402
+from amortizacion import tabla_credito  # noqa: E402
+from indice import IndiceCalendario  # noqa: E402
+
+# --- Benchmarks de los caminos críticos del simulador ---
+# Mide tiempo (mediana y p95) y memoria pico de cada etapa, guarda el
+# resultado en JSON y lo compara con una línea base para detectar regresiones.
+#
+#   python benchmarks/bench.py                      # mide y compara con la base
+#   python benchmarks/bench.py --guardar-base       # actualiza la base
+
+RUTA_BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+INDICADORES_FIJOS = {"uf": 37000.0, "dolar": 900.0, "ipc": 0.3, "tpm": 5.0}
+ESCENARIO = dict(credito_uf=2436.0, tasa_anual=0.037, pie_uf=609.0, seguro_mensual=10000, uf_clp=37000.0)
+
+
+def medir(funcion, repeticiones):
+    funcion()  # calentamiento
+    tiempos = []
+    for _ in range(repeticiones):
+        gc.collect()
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    tracemalloc.start()
+    funcion()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    tiempos.sort()
+    return {
+        "mediana_ms": statistics.median(tiempos) * 1000,
+        "p95_ms": tiempos[min(int(len(tiempos) * 0.95), len(tiempos) - 1)] * 1000,
+        "memoria_pico_kb": pico / 1024,
+        "repeticiones": repeticiones,
+    }
+
+
+def casos():
+    e = ESCENARIO
+    # `__wrapped__` salta la memoización para medir el cálculo real
+    for plazo in (1, 5, 10, 20, 30):
+        yield f"amortizacion_{plazo}a", lambda p=plazo: tabla_credito(e["credito_uf"], e["tasa_anual"], p)
+    yield "comparativa_plazos", lambda: simulador.comparar_plazos.__wrapped__(
+        e["credito_uf"], e["tasa_anual"], e["pie_uf"], e["seguro_mensual"], e["uf_clp"])
+    yield "comparativa_styler", lambda: simulador.tabla_comparativa(
+        e["credito_uf"], e["tasa_anual"], e["pie_uf"], e["seguro_mensual"], e["uf_clp"], 20).to_html()
+
+    tabla = tabla_credito(e["credito_uf"], e["tasa_anual"], 30)
+    agregada = IndiceCalendario(tabla).rollup("mes")
+    yield "tabla_pagina_styler", lambda: exportacion.pagina(agregada, "mes", 1, 24, e["uf_clp"]).style.format("{:.2f}").to_html()
+    yield "figura_distribucion", lambda: simulador.figura_distribucion.__wrapped__(
+        e["pie_uf"], e["credito_uf"], 1000.0, e["uf_clp"]).to_json()
+    yield "figura_anual", lambda: simulador.figura_anual.__wrapped__(
+        e["credito_uf"], e["tasa_anual"], 30, 0.0, 0, e["uf_clp"]).to_json()
+    yield "exportar_csv", lambda: exportacion.exportar(tabla, e["uf_clp"], "csv")
+
+
+def rerun_completo(frio):
+    from streamlit.testing.v1 import AppTest
+
+    def correr():
+        if frio:
+            cache_resultados.cache.limpiar()
+            for nombre in dir(simulador):
+                cache_clear = getattr(getattr(simulador, nombre), "cache_clear", None)
+                if cache_clear:
+                    cache_clear()
+        at = AppTest.from_file(os.path.join(RAIZ, "app.py"), default_timeout=60)
+        at.run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+    return correr
+
+
+def ejecutar(repeticiones, con_app):
+    # Sin red: el proveedor de indicadores usa una fuente local fija
+    indicadores.configurar(indicadores.fuente_local(INDICADORES_FIJOS), ruta_snapshot=None)
+    resultados = {nombre: medir(funcion, repeticiones) for nombre, funcion in casos()}
+    if con_app:
+        resultados["app_rerun_frio"] = medir(rerun_completo(True), max(repeticiones // 10, 3))
+        resultados["app_rerun_caliente"] = medir(rerun_completo(False), max(repeticiones // 10, 3))
+    return resultados
+
+
+def comparar(resultados, base, tolerancia):
+    regresiones = []
+    for nombre, actual in resultados.items():
+        anterior = base.get("resultados", {}).get(nombre)
+        if not anterior:
+            continue
+        razon = actual["mediana_ms"] / max(anterior["mediana_ms"], 1e-6)
+        actual["vs_base"] = razon
+        if razon > 1 + tolerancia:
+            regresiones.append((nombre, anterior["mediana_ms"], actual["mediana_ms"], razon))
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks del simulador hipotecario.")
+    parser.add_argument("--repeticiones", type=int, default=50)
+    parser.add_argument("--salida", help="Archivo JSON de resultados (por defecto, stdout)")
+    parser.add_argument("--base", default=RUTA_BASE, help="Línea base para comparar")
+    parser.add_argument("--guardar-base", action="store_true", help="Guarda los resultados como nueva base")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="Regresión permitida (0.25 = 25%%)")
+    parser.add_argument("--sin-app", action="store_true", help="Omite el rerun completo de app.py")
+    args = parser.parse_args(argv)
+
+    resultados = ejecutar(args.repeticiones, not args.sin_app)
+    reporte = {
+        "python": platform.python_version(),
+        "maquina": platform.machine(),
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "resultados": resultados,
+    }
+
+    regresiones = []
+    if os.path.exists(args.base) and not args.guardar_base:
+        with open(args.base, encoding="utf-8") as f:
+            regresiones = comparar(resultados, json.load(f), args.tolerancia)
+    reporte["regresiones"] = [n for n, *_ in regresiones]
+
+    texto = json.dumps(reporte, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto)
+    else:
+        print(texto)
+    if args.guardar_base:
+        with open(args.base, "w", encoding="utf-8") as f:
+            f.write(texto)
+
+    for nombre, antes, ahora, razon in regresiones:
+        print(f"REGRESIÓN {nombre}: {antes:.2f} ms -> {ahora:.2f} ms (x{razon:.2f})", file=sys.stderr)
+    return 1 if regresiones else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
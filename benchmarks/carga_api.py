@@ -0,0 +1,127 @@
+import argparse
+import http.client
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# --- Prueba de carga de la API ---
+# Varios clientes concurrentes con conexiones keep-alive contra una instancia
+# local de api.py. Reporta requests/s, escenarios/s y latencias en JSON.
+#
+#   python benchmarks/carga_api.py --lanzar                   # levanta la API y la mide
+#   python benchmarks/carga_api.py --url 127.0.0.1:8000 --lote 1000 --clientes 8
+
+
+def escenarios(n, semilla=0):
+    rng = np.random.default_rng(semilla)
+    precio = rng.uniform(1500, 12000, n).round(1)
+    return [
+        {"precio_uf": float(p), "pie_uf": float(round(p * pie, 1)), "plazo": int(plazo),
+         "tasa_anual": float(round(tasa, 4)), "seguro_mensual": 10000}
+        for p, pie, plazo, tasa in zip(precio, rng.uniform(0.1, 0.4, n), rng.integers(5, 31, n), rng.uniform(0.02, 0.07, n))
+    ]
+
+
+def cliente(host, puerto, ruta, cuerpos, duracion, latencias, errores):
+    conexion = http.client.HTTPConnection(host, puerto, timeout=60)
+    fin = time.perf_counter() + duracion
+    i = 0
+    while time.perf_counter() < fin:
+        inicio = time.perf_counter()
+        try:
+            conexion.request("POST", ruta, body=cuerpos[i % len(cuerpos)], headers={"Content-Type": "application/json"})
+            respuesta = conexion.getresponse()
+            respuesta.read()
+            if respuesta.status != 200:
+                errores.append(respuesta.status)
+        except (OSError, http.client.HTTPException) as e:
+            errores.append(repr(e))
+            conexion.close()
+            conexion = http.client.HTTPConnection(host, puerto, timeout=60)
+        latencias.append(time.perf_counter() - inicio)
+        i += 1
+    conexion.close()
+
+
+def esperar(host, puerto, limite=30):
+    fin = time.time() + limite
+    while time.time() < fin:
+        try:
+            conexion = http.client.HTTPConnection(host, puerto, timeout=1)
+            conexion.request("GET", "/salud")
+            if conexion.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"La API no respondió en {host}:{puerto}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API del simulador.")
+    parser.add_argument("--url", default="127.0.0.1:8000", help="host:puerto de la API")
+    parser.add_argument("--lanzar", action="store_true", help="Levanta api.py localmente durante la prueba")
+    parser.add_argument("--workers", type=int, default=1, help="Procesos de la API con --lanzar")
+    parser.add_argument("--clientes", type=int, default=8, help="Clientes concurrentes")
+    parser.add_argument("--duracion", type=float, default=10.0, help="Segundos de carga")
+    parser.add_argument("--lote", type=int, default=0, help="Escenarios por request (0 = /simular individual)")
+    parser.add_argument("--sin-diagnostico", action="store_true", help="Lotes sin diagnóstico")
+    args = parser.parse_args(argv)
+
+    host, puerto = args.url.rsplit(":", 1)
+    puerto = int(puerto)
+    if args.lote:
+        ruta = "/simular/lote"
+        cuerpos = [json.dumps({"escenarios": escenarios(args.lote, s), "uf_clp": 37000,
+                               "diagnostico": not args.sin_diagnostico}) for s in range(8)]
+    else:
+        ruta = "/simular"
+        cuerpos = [json.dumps({**e, "uf_clp": 37000}) for e in escenarios(2000)]
+
+    servidor = None
+    if args.lanzar:
+        servidor = subprocess.Popen([sys.executable, os.path.join(RAIZ, "api.py"), "--host", host,
+                                     "--puerto", str(puerto), "--workers", str(args.workers)], cwd=RAIZ)
+    try:
+        esperar(host, puerto)
+        latencias, errores = [], []
+        hilos = [threading.Thread(target=cliente, args=(host, puerto, ruta, cuerpos, args.duracion, latencias, errores))
+                 for _ in range(args.clientes)]
+        inicio = time.perf_counter()
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+        transcurrido = time.perf_counter() - inicio
+    finally:
+        if servidor is not None:
+            servidor.terminate()
+            servidor.wait()
+
+    latencias.sort()
+    n = len(latencias)
+    reporte = {
+        "ruta": ruta,
+        "clientes": args.clientes,
+        "escenarios_por_request": args.lote or 1,
+        "requests": n,
+        "errores": len(errores),
+        "requests_por_s": n / transcurrido,
+        "escenarios_por_s": n * (args.lote or 1) / transcurrido,
+        "p50_ms": statistics.median(latencias) * 1000 if n else None,
+        "p95_ms": latencias[min(int(n * 0.95), n - 1)] * 1000 if n else None,
+        "p99_ms": latencias[min(int(n * 0.99), n - 1)] * 1000 if n else None,
+    }
+    print(json.dumps(reporte, indent=2, ensure_ascii=False))
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
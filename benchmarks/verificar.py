@@ -0,0 +1,117 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from amortizacion import calcular_tabla, dividendo, resumen_lote, tasa_mensual  # noqa: E402
+from montecarlo import pagos_tasa_variable  # noqa: E402
+
+# --- Verificación de los motores contra el cálculo mes a mes ---
+# Compara la tabla vectorizada y los totales de `resumen_lote` con un bucle
+# de referencia, mes a mes, sobre casos de borde (prepago en el último año,
+# prepago mayor que el saldo, tasa 0) y una muestra aleatoria de créditos.
+# También compara el camino de tasa variable de Monte Carlo, sin volatilidad,
+# con el calendario de tasa fija.
+# Termina con código 1 si alguna diferencia supera la tolerancia.
+#
+#   python benchmarks/verificar.py
+#   python benchmarks/verificar.py --n 5000 --semilla 7
+
+TOLERANCIA = 1e-6
+CASOS_BORDE = [
+    # (credito_uf, tasa_anual, plazo, prepago_monto, prepago_ano)
+    (2436.0, 0.037, 20, 0.0, 0),
+    (2436.0, 0.037, 20, 100.0, 20),
+    (2436.0, 0.037, 20, 500.0, 19),
+    (2436.0, 0.037, 20, 500.0, 5),
+    (2436.0, 0.037, 20, 5000.0, 1),
+    (1000.0, 0.05, 10, 900.0, 1),
+    (2436.0, 0.0, 20, 300.0, 3),
+    (2436.0, 0.0, 20, 3000.0, 3),
+    (500.0, 0.12, 1, 50.0, 1),
+    (0.0, 0.037, 20, 100.0, 5),
+]
+
+
+def referencia(credito_uf, tasa_anual, plazo, prepago_monto=0.0, prepago_ano=0):
+    # Cuota, luego prepago a fin de mes; el crédito termina cuando el saldo llega a 0
+    r = float(tasa_mensual(tasa_anual))
+    cuota = float(dividendo(credito_uf, tasa_anual, plazo))
+    saldo = max(float(credito_uf), 0.0)
+    capital, interes, saldos = [], [], []
+    for mes in range(1, plazo * 12 + 1):
+        i = saldo * r
+        c = min(cuota - i, saldo)
+        saldo -= c
+        if prepago_monto > 0 and mes == prepago_ano * 12:
+            saldo -= min(prepago_monto, saldo)
+        capital.append(c)
+        interes.append(i)
+        saldos.append(saldo)
+    return np.array(capital), np.array(interes), np.array(saldos)
+
+
+def verificar(casos):
+    credito, tasa, plazo, p_monto, p_ano = (np.array(c) for c in zip(*casos))
+    tabla = calcular_tabla(credito, tasa, plazo, p_monto, p_ano)
+    resumen = resumen_lote(credito, tasa, plazo, p_monto, p_ano)
+    errores = []
+    for j, caso in enumerate(casos):
+        capital, interes, saldo = referencia(*caso)
+        n = len(capital)
+        escala = max(caso[0], 1.0)
+        diferencias = {
+            "capital": np.abs(tabla["capital"][j, :n] - capital).max(initial=0),
+            "interes": np.abs(tabla["interes"][j, :n] - interes).max(initial=0),
+            "saldo": np.abs(tabla["saldo"][j, :n] - saldo).max(initial=0),
+            "interes_total": abs(resumen["interes_total"][j] - interes.sum()),
+            "capital_total": abs(resumen["capital_total"][j] - capital.sum()),
+        }
+        for campo, d in diferencias.items():
+            if d > TOLERANCIA * escala:
+                errores.append(f"{caso}: {campo} difiere en {d:.3g} UF")
+    return errores
+
+
+def verificar_tasa_variable(casos):
+    # Sin shocks de tasa, la tasa variable debe pagar lo mismo que el calendario fijo
+    errores = []
+    rng = np.random.default_rng(0)
+    for caso in casos:
+        credito, tasa, plazo, p_monto, p_ano = caso
+        capital, interes, _ = referencia(*caso)
+        pagos = pagos_tasa_variable(credito, tasa, plazo, 0.0, 12, 1, rng, p_monto, p_ano)[0]
+        d = np.abs(pagos - (capital + interes)).max(initial=0)
+        if d > TOLERANCIA * max(credito, 1.0):
+            errores.append(f"{caso}: tasa variable sin volatilidad difiere en {d:.3g} UF")
+    return errores
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verifica los motores de amortización contra el cálculo mes a mes.")
+    parser.add_argument("--n", type=int, default=500, help="Créditos aleatorios además de los casos de borde")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.semilla)
+    plazo = rng.integers(1, 31, args.n)
+    aleatorios = list(zip(
+        rng.uniform(500, 15000, args.n).round(1).tolist(),
+        rng.choice([0.0, 0.02, 0.037, 0.05, 0.08], args.n).tolist(),
+        plazo.tolist(),
+        np.where(rng.random(args.n) < 0.6, rng.uniform(0, 8000, args.n).round(1), 0.0).tolist(),
+        (rng.random(args.n) * plazo).astype(int).clip(0).tolist(),
+    ))
+    errores = verificar(CASOS_BORDE + aleatorios) + verificar_tasa_variable(CASOS_BORDE + aleatorios[:100])
+    for e in errores:
+        print(e)
+    print(f"{len(CASOS_BORDE) + len(aleatorios)} créditos verificados, {len(errores)} diferencias")
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
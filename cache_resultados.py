@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# --- Caché de resultados compartida entre sesiones ---
+# Direccionada por contenido: la clave es un hash canónico de las entradas
+# (redondeadas para que 3.7 y 3.7000000001 caigan en la misma entrada).
+# Acotada por bytes con desalojo LRU y contadores de aciertos/fallos.
+
+PRESUPUESTO_BYTES = int(float(os.environ.get("SIMULADOR_CACHE_MB", "64")) * 1024 * 1024)
+DECIMALES = 8
+
+
+def _canonico(valor):
+    if isinstance(valor, (bool, np.bool_)):
+        return bool(valor)
+    if isinstance(valor, (int, np.integer)):
+        return int(valor)
+    if isinstance(valor, (float, np.floating)):
+        valor = round(float(valor), DECIMALES)
+        return int(valor) if valor.is_integer() else valor
+    if isinstance(valor, (tuple, list)):
+        return [_canonico(v) for v in valor]
+    return valor
+
+
+def clave(tipo, **entradas):
+    # Mismo escenario -> misma clave, sin importar el orden ni int vs float
+    texto = json.dumps({"tipo": tipo, **{k: _canonico(v) for k, v in entradas.items()}},
+                       sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(texto.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def tamano_bytes(valor):
+    # Estimación del tamaño: arreglos por `nbytes`, el resto por sys.getsizeof
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes + 112
+    if hasattr(valor, "nbytes"):
+        return int(valor.nbytes)
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(tamano_bytes(v) for v in valor.values())
+    if isinstance(valor, (tuple, list)):
+        return sys.getsizeof(valor) + sum(tamano_bytes(v) for v in valor)
+    return sys.getsizeof(valor)
+
+
+class CacheResultados:
+    def __init__(self, presupuesto_bytes=PRESUPUESTO_BYTES):
+        self.presupuesto_bytes = presupuesto_bytes
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def obtener(self, k):
+        with self._lock:
+            entrada = self._entradas.get(k)
+            if entrada is None:
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(k)
+            self.aciertos += 1
+            return entrada[0]
+
+    def guardar(self, k, valor):
+        tamano = tamano_bytes(valor)
+        if tamano > self.presupuesto_bytes:
+            return valor
+        with self._lock:
+            anterior = self._entradas.pop(k, None)
+            if anterior is not None:
+                self.bytes -= anterior[1]
+            self._entradas[k] = (valor, tamano)
+            self.bytes += tamano
+            while self.bytes > self.presupuesto_bytes:
+                _, (_, liberado) = self._entradas.popitem(last=False)
+                self.bytes -= liberado
+                self.desalojos += 1
+        return valor
+
+    def obtener_o_calcular(self, k, calcular):
+        valor = self.obtener(k)
+        if valor is None:
+            # Dos sesiones pueden calcular el mismo escenario a la vez; gana la última
+            valor = self.guardar(k, calcular())
+        return valor
+
+    def estadisticas(self):
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._entradas),
+                "bytes": self.bytes,
+                "presupuesto_bytes": self.presupuesto_bytes,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "desalojos": self.desalojos,
+                "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+            }
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self.bytes = 0
+
+
+# Instancia única por proceso, compartida por todas las sesiones de Streamlit
+cache = CacheResultados()
@@ -0,0 +1,212 @@
+import json
+import numbers
+import operator
+import string
+import threading
+from collections import Counter, namedtuple
+
+import numpy as np
+
+# --- Motor de reglas del diagnóstico financiero ---
+# Cada regla es una fila de una tabla: código, grupo, condiciones (campo,
+# operador, umbral) unidas con "y", y un mensaje. Dentro de un grupo gana la
+# primera regla que se cumple (como un if/elif); las reglas sin grupo son
+# independientes. Las condiciones se evalúan como máscaras sobre columnas
+# completas, así un escenario o una cartera entera se resuelven igual.
+#
+# Campos: tasa_anual, pie_pct, plazo, ratio_total, sueldo_recomendado,
+# anio_salto (0 si no hay cruce), primeros_5_anios_interes, uf_clp,
+# prepago_monto, prepago_ano, saldo_prepago, cap_rate, total_beneficios,
+# objetivo, edad y tipo_trabajo.
+
+Regla = namedtuple("Regla", "codigo grupo condiciones mensaje")
+
+OPERADORES = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+              "==": operator.eq, "!=": operator.ne}
+ORDEN = {"<", "<=", ">", ">="}
+
+REGLAS = (
+    Regla("TASA_EXCELENTE", "tasa", (("tasa_anual", "<", 0.035),),
+          "🔵 Excelente tasa. Lograste condiciones muy competitivas."),
+    Regla("TASA_BUENA", "tasa", (("tasa_anual", "<=", 0.045),),
+          "🟢 Buena tasa. Estás dentro del rango óptimo actual."),
+    Regla("TASA_ACEPTABLE", "tasa", (("tasa_anual", "<=", 0.055),),
+          "🟡 Tasa aceptable, pero podrías buscar mejores opciones."),
+    Regla("TASA_ALTA", "tasa", (),
+          "🔴 Tasa alta. Evalúa cotizar con otros bancos o esperar mejores condiciones."),
+    Regla("PIE_EXCELENTE", "pie", (("pie_pct", ">=", 0.25),),
+          "🔵 Excelente pie inicial. Reduciste el monto y los intereses del crédito."),
+    Regla("PIE_BUENO", "pie", (("pie_pct", ">=", 0.20),),
+          "🟢 Buen pie inicial. Cumples con lo recomendado por la banca."),
+    Regla("PIE_ACEPTABLE", "pie", (("pie_pct", ">=", 0.15),),
+          "🟡 Pie aceptable. Considera aumentarlo si puedes."),
+    Regla("PIE_BAJO", "pie", (),
+          "🔴 Pie muy bajo. Podrías enfrentar mayores intereses y restricciones."),
+    Regla("PLAZO_LARGO", "plazo", (("plazo", ">", 25),),
+          "🟡 Plazo largo. Cuotas más bajas, pero pagas más intereses."),
+    Regla("PLAZO_CORTO", "plazo", (("plazo", "<", 15),),
+          "🟢 Plazo corto. Ahorro en intereses, pero cuota más exigente."),
+    Regla("COSTO_DOBLE", "costo", (("ratio_total", ">", 2.0),),
+          "🔴 Estás pagando más del doble del crédito en total. Revisa la tasa y plazo."),
+    Regla("COSTO_ELEVADO", "costo", (("ratio_total", ">", 1.7),),
+          "🟡 Costo total elevado. Ajustar plazo o tasa podría ayudar."),
+    Regla("COSTO_RAZONABLE", "costo", (),
+          "🟢 Costo total razonable. Bien controlado."),
+    Regla("INGRESO_ALTO", "ingreso", (("sueldo_recomendado", ">", 2_000_000),),
+          "🟡 El dividendo requiere un ingreso mensual alto. Evalúa reducir el monto del crédito o aumentar el pie."),
+    Regla("INGRESO_HOLGADO", "ingreso", (("sueldo_recomendado", "<", 1_200_000),),
+          "🟢 Buena relación cuota / ingreso estimado. Deberías poder cumplir con holgura."),
+    Regla("CRUCE_CAPITAL", "cruce", (("anio_salto", ">", 0),),
+          "🟢 A partir del año {anio_salto:.0f} pagas más capital que interés en cada cuota. La deuda se reduce más rápido."),
+    Regla("SIN_CRUCE", "cruce", (),
+          "🟡 Durante todo el plazo, el pago de interés supera el capital. Considera reducir plazo o negociar mejor tasa."),
+    Regla("INTERES_5_ANIOS", None, (),
+          "En los primeros 5 años pagarás aproximadamente {primeros_5_anios_interes:.2f} UF "
+          "(~${interes_5_anios_clp:,.0f} CLP) solo en intereses."),
+    Regla("PREPAGO", None, (("prepago_monto", ">", 0),),
+          "Prepago de {prepago_monto:.2f} UF en año {prepago_ano:.0f}: reduce el saldo a {saldo_prepago:.2f} UF "
+          "y disminuye intereses futuros."),
+    Regla("CAPRATE_BAJO", "cap_rate", (("cap_rate", ">", 0), ("cap_rate", "<", 4)),
+          "⚠️ El CAP RATE es bajo para inversión. Evalúa opciones con mejor rentabilidad."),
+    Regla("CAPRATE_BUENO", "cap_rate", (("cap_rate", ">", 6),),
+          "🟢 Buen CAP RATE. El arriendo cubre bien la cuota y el crédito."),
+    Regla("BENEFICIOS", None, (("total_beneficios", ">", 0),),
+          "🟢 Has aplicado beneficios/subsidios por un total de {total_beneficios:.2f} UF. "
+          "Esto reduce el monto solicitado y los intereses pagados."),
+    Regla("INVERSION_CAPRATE", None, (("objetivo", "==", "Inversión"), ("cap_rate", "<", 5)),
+          "⚠️ Como tu objetivo es inversión, considera buscar propiedades con mejor rentabilidad (Cap Rate > 5%)."),
+    Regla("JOVEN_PLAZO_LARGO", None, (("edad", "<", 25), ("plazo", ">", 25)),
+          "🟢 Al ser joven, puedes optar por plazos largos, pero revisa el costo total."),
+    Regla("INDEPENDIENTE_PIE", None, (("tipo_trabajo", "==", "Independiente"), ("pie_pct", "<", 0.20)),
+          "🟡 Si eres independiente, los bancos suelen exigir mayor pie inicial."),
+)
+
+
+def ajustar(reglas=REGLAS, umbrales=None, desactivar=()):
+    """Variante de la tabla para un banco o producto.
+
+    `umbrales` cambia umbrales puntuales, p. ej. {"PIE_BUENO.pie_pct": 0.25};
+    si la regla tiene más de una condición sobre el campo se indica también
+    el operador: {"CAPRATE_BAJO.cap_rate<": 5}. `desactivar` quita reglas por
+    código.
+    """
+    umbrales = dict(umbrales or {})
+    operadores = {}
+    for r in reglas:
+        for c, op, _ in r.condiciones:
+            operadores.setdefault(f"{r.codigo}.{c}{op}", []).append(op)
+            operadores.setdefault(f"{r.codigo}.{c}", []).append(op)
+    desconocidos = set(umbrales) - set(operadores)
+    if desconocidos:
+        raise ValueError(f"Umbrales desconocidos: {', '.join(sorted(desconocidos))}")
+    ambiguos = [k for k in umbrales if len(operadores[k]) > 1]
+    if ambiguos:
+        raise ValueError(f"Umbrales ambiguos, indica el operador (p. ej. {ambiguos[0]}<): {', '.join(sorted(ambiguos))}")
+    # Las comparaciones de orden sólo admiten números
+    no_numericos = [k for k, v in umbrales.items()
+                    if operadores[k][0] in ORDEN and (isinstance(v, bool) or not isinstance(v, numbers.Real))]
+    if no_numericos:
+        raise ValueError(f"Umbrales no numéricos: {', '.join(sorted(no_numericos))}")
+
+    def umbral(r, c, op, v):
+        return umbrales.get(f"{r.codigo}.{c}{op}", umbrales.get(f"{r.codigo}.{c}", v))
+
+    return tuple(
+        r._replace(condiciones=tuple((c, op, umbral(r, c, op, v)) for c, op, v in r.condiciones))
+        for r in reglas if r.codigo not in desactivar
+    )
+
+
+def cargar_reglas(ruta):
+    # JSON: {"umbrales": {"CODIGO.campo": valor}, "desactivar": ["CODIGO", ...]}; ver `ajustar`
+    with open(ruta, encoding="utf-8") as f:
+        config = json.load(f)
+    return ajustar(REGLAS, config.get("umbrales"), config.get("desactivar", ()))
+
+
+def evaluar(datos, reglas=REGLAS):
+    """Máscara (reglas × escenarios) de las reglas que se disparan.
+
+    `datos` es un DataFrame o un dict de columnas (o de escalares, para un
+    único escenario).
+    """
+    columnas = {c: np.asarray(datos[c]) for r in reglas for c, _, _ in r.condiciones}
+    forma = np.broadcast_shapes(*(v.shape for v in columnas.values()))
+    mascaras = np.zeros((len(reglas),) + forma, dtype=bool)
+    cubierto = {}
+    for i, r in enumerate(reglas):
+        cumple = np.ones(forma, dtype=bool)
+        for campo, op, valor in r.condiciones:
+            cumple &= OPERADORES[op](columnas[campo], valor)
+        if r.grupo is not None:
+            previo = cubierto.get(r.grupo, np.zeros(forma, dtype=bool))
+            cumple &= ~previo
+            cubierto[r.grupo] = previo | cumple
+        mascaras[i] = cumple
+    _registrar(reglas, mascaras)
+    return mascaras
+
+
+def codigos(mascaras, reglas=REGLAS, separador=";"):
+    # Códigos disparados por escenario, unidos por `separador`. Las carteras
+    # repiten pocas combinaciones: cada una se arma como texto una sola vez.
+    planas = np.ascontiguousarray(np.packbits(mascaras.reshape(len(reglas), -1), axis=0).T)
+    filas = planas.view(np.dtype((np.void, planas.shape[1]))).ravel()
+    combinaciones, inversa = np.unique(filas, return_inverse=True)
+    activas = np.unpackbits(combinaciones.view(np.uint8).reshape(len(combinaciones), -1), axis=1,
+                            count=len(reglas)).astype(bool)
+    textos = np.array([separador.join(r.codigo for r, a in zip(reglas, fila) if a) for fila in activas], dtype=object)
+    return textos[inversa.ravel()].reshape(mascaras.shape[1:])
+
+
+def conteos(mascaras, reglas=REGLAS):
+    n = mascaras.reshape(len(reglas), -1).sum(axis=1)
+    return {r.codigo: int(c) for r, c in zip(reglas, n)}
+
+
+def _con_derivados(valores):
+    return {**valores, "interes_5_anios_clp": valores["primeros_5_anios_interes"] * valores["uf_clp"]}
+
+
+def mensajes(valores, mascara, reglas=REGLAS):
+    # Textos de un escenario; `valores` trae los campos como escalares
+    valores = _con_derivados(valores)
+    return tuple(r.mensaje.format(**valores) for r, activa in zip(reglas, mascara) if activa)
+
+
+def mensajes_lote(campos, mascaras, reglas=REGLAS):
+    """Textos de cada escenario de un lote (`campos` como columnas).
+
+    Los mensajes fijos no se formatean; los que llevan cifras sólo leen sus
+    campos y sólo en las filas donde la regla se disparó.
+    """
+    campos = _con_derivados(campos)
+    columnas = np.full((len(reglas), mascaras.shape[1]), None, dtype=object)
+    for i, (r, m) in enumerate(zip(reglas, mascaras)):
+        usados = [f for _, f, _, _ in string.Formatter().parse(r.mensaje) if f]
+        if not usados:
+            columnas[i, m] = r.mensaje
+        elif m.any():
+            valores = zip(*(np.asarray(campos[f])[m].tolist() for f in usados))
+            columnas[i, m] = [r.mensaje.format(**dict(zip(usados, v))) for v in valores]
+    return [[t for t in fila if t is not None] for fila in columnas.T.tolist()]
+
+
+# Aciertos acumulados por regla en el proceso, para monitoreo
+_acumulado = Counter()
+_lock = threading.Lock()
+
+
+def _registrar(reglas, mascaras):
+    with _lock:
+        _acumulado.update(conteos(mascaras, reglas))
+
+
+def estadisticas():
+    with _lock:
+        return dict(_acumulado)
+
+
+def limpiar():
+    with _lock:
+        _acumulado.clear()
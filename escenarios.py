@@ -0,0 +1,164 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+
+import numpy as np
+
+# --- Escenarios guardados ---
+# Cada escenario guarda sus entradas, sus métricas ya calculadas y las curvas
+# mensuales de saldo y cuota. En memoria todo vive en arreglos (una fila por
+# escenario), así comparar N escenarios es indexar filas, sin recalcular
+# calendarios. Se persiste en un archivo SQLite local.
+#
+# Cada espacio pertenece a un dueño (un token opaco por usuario): la tabla
+# usa (dueno, nombre) como clave y un espacio sólo ve, reemplaza y elimina
+# sus propios escenarios.
+
+RUTA_DB = os.environ.get(
+    "SIMULADOR_ESCENARIOS_DB",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "escenarios.db"),
+)
+ENTRADAS = ("precio_uf", "pie_uf", "total_beneficios", "plazo", "tasa_anual", "seguro_mensual",
+            "prepago_monto", "prepago_ano", "uf_clp")
+METRICAS = {
+    "credito_uf": "Crédito UF",
+    "dividendo_uf": "Dividendo UF",
+    "dividendo_clp": "Dividendo CLP",
+    "interes_total": "Intereses totales UF",
+    "monto_total_uf": "Total a pagar UF",
+    "sueldo_recomendado": "Sueldo requerido CLP",
+    "mes_termino": "Mes de término",
+}
+MESES_MAX = 360
+FILA = np.dtype([(c, "f8") for c in ENTRADAS + tuple(METRICAS)])
+
+
+def nuevo_dueno():
+    return uuid.uuid4().hex
+
+
+def dueno_valido(dueno):
+    return isinstance(dueno, str) and re.fullmatch(r"[0-9a-f]{32}", dueno) is not None
+
+
+class EspacioEscenarios:
+    def __init__(self, ruta=RUTA_DB, dueno=""):
+        self.ruta = ruta
+        self.dueno = dueno
+        self._lock = threading.Lock()
+        self.nombres = []
+        self.filas = np.zeros(0, FILA)
+        # Curvas en float32, rellenas con 0 después del término del crédito
+        self.saldo = np.zeros((0, MESES_MAX), np.float32)
+        self.cuota = np.zeros((0, MESES_MAX), np.float32)
+        self.version = 0
+        self._conexion = None
+        if ruta:
+            os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+            self._conexion = sqlite3.connect(ruta, check_same_thread=False)
+            self._crear_tabla()
+            self._cargar()
+
+    def _crear_tabla(self):
+        with self._conexion:
+            existentes = [c[1] for c in self._conexion.execute("PRAGMA table_info(escenarios)")]
+            if existentes and "dueno" not in existentes:
+                # Tabla anterior, sin dueño: se aparta para que nadie vea esas filas
+                self._conexion.execute("ALTER TABLE escenarios RENAME TO escenarios_sin_dueno")
+            columnas = ", ".join(f"{c} REAL" for c in FILA.names)
+            self._conexion.execute(
+                f"CREATE TABLE IF NOT EXISTS escenarios (dueno TEXT NOT NULL, nombre TEXT NOT NULL, {columnas}, "
+                "saldo BLOB, cuota BLOB, guardado REAL, PRIMARY KEY (dueno, nombre))")
+
+    def _cargar(self):
+        filas = self._conexion.execute(
+            f"SELECT nombre, {', '.join(FILA.names)}, saldo, cuota FROM escenarios WHERE dueno = ? ORDER BY guardado",
+            (self.dueno,)).fetchall()
+        n = len(filas)
+        self.nombres = [f[0] for f in filas]
+        self.filas = np.array([tuple(f[1:-2]) for f in filas], dtype=FILA) if n else np.zeros(0, FILA)
+        self.saldo = np.zeros((n, MESES_MAX), np.float32)
+        self.cuota = np.zeros((n, MESES_MAX), np.float32)
+        for i, f in enumerate(filas):
+            saldo, cuota = np.frombuffer(f[-2], np.float32), np.frombuffer(f[-1], np.float32)
+            self.saldo[i, :len(saldo)] = saldo
+            self.cuota[i, :len(cuota)] = cuota
+
+    def __len__(self):
+        return len(self.nombres)
+
+    def __contains__(self, nombre):
+        return nombre in self.nombres
+
+    def guardar(self, nombre, entradas, metricas, saldo, cuota):
+        """Agrega o reemplaza el escenario `nombre`. Las curvas van en UF por mes."""
+        fila = np.array(tuple(float(entradas[c]) for c in ENTRADAS) + tuple(float(metricas[c]) for c in METRICAS),
+                        dtype=FILA)
+        saldo = np.asarray(saldo, np.float32)[:MESES_MAX]
+        cuota = np.asarray(cuota, np.float32)[:MESES_MAX]
+        with self._lock:
+            if nombre in self.nombres:
+                i = self.nombres.index(nombre)
+            else:
+                i = len(self.nombres)
+                self.nombres.append(nombre)
+                self.filas = np.concatenate([self.filas, np.zeros(1, FILA)])
+                self.saldo = np.vstack([self.saldo, np.zeros((1, MESES_MAX), np.float32)])
+                self.cuota = np.vstack([self.cuota, np.zeros((1, MESES_MAX), np.float32)])
+            self.filas[i] = fila
+            self.saldo[i] = 0
+            self.saldo[i, :len(saldo)] = saldo
+            self.cuota[i] = 0
+            self.cuota[i, :len(cuota)] = cuota
+            self.version += 1
+            if self._conexion is not None:
+                self._conexion.execute(
+                    f"INSERT OR REPLACE INTO escenarios VALUES (?, ?, {', '.join('?' * len(FILA.names))}, ?, ?, ?)",
+                    (self.dueno, nombre, *fila.tolist(), saldo.tobytes(), cuota.tobytes(), time.time()))
+                self._conexion.commit()
+
+    def eliminar(self, nombre):
+        with self._lock:
+            if nombre not in self.nombres:
+                return
+            i = self.nombres.index(nombre)
+            self.nombres.pop(i)
+            self.filas = np.delete(self.filas, i)
+            self.saldo = np.delete(self.saldo, i, axis=0)
+            self.cuota = np.delete(self.cuota, i, axis=0)
+            self.version += 1
+            if self._conexion is not None:
+                self._conexion.execute("DELETE FROM escenarios WHERE dueno = ? AND nombre = ?", (self.dueno, nombre))
+                self._conexion.commit()
+
+    def seleccion(self, nombres):
+        """Filas, saldo y cuota de los escenarios pedidos, en ese orden."""
+        with self._lock:
+            idx = [self.nombres.index(n) for n in nombres if n in self.nombres]
+            return self.filas[idx], self.saldo[idx], self.cuota[idx]
+
+    def diferencias(self, nombres, metricas=tuple(METRICAS)):
+        # Métricas de cada escenario menos las del primero (la base)
+        filas, _, _ = self.seleccion(nombres)
+        if not len(filas):
+            return {m: np.zeros(0) for m in metricas}
+        return {m: filas[m] - filas[m][0] for m in metricas}
+
+
+_ruta = RUTA_DB
+
+
+def espacio(dueno):
+    # Espacio de un dueño; la app guarda uno por sesión en st.session_state
+    if not dueno_valido(dueno):
+        raise ValueError("Dueño de escenarios inválido")
+    return EspacioEscenarios(_ruta, dueno)
+
+
+def configurar(ruta=RUTA_DB):
+    # Cambia la base de los espacios que se abran después (`ruta=None`: sólo en memoria)
+    global _ruta
+    _ruta = ruta
@@ -0,0 +1,166 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+
+from amortizacion import tasa_mensual
+
+# --- Motor de calendario por eventos ---
+# El crédito avanza por tramos entre eventos (prepagos, cambios de tasa,
+# cambios de seguro). Cada tramo se resuelve con la fórmula cerrada de la
+# anualidad, así el costo depende del número de eventos y no de los meses.
+#
+# Un evento con `mes = m` se aplica al cierre del mes m, después de pagar ese
+# dividendo (igual que el prepago de la app: mes = año · 12).
+
+Evento = namedtuple("Evento", ["mes", "tipo", "valor", "modo"], defaults=[None])
+Tramo = namedtuple("Tramo", [
+    "desde", "hasta", "tasa_anual", "cuota_uf", "seguro_clp",
+    "saldo_inicial", "saldo_final", "interes", "capital",
+])
+
+TIPOS = ("prepago", "tasa", "seguro")
+MODOS_PREPAGO = ("plazo", "dividendo")
+
+
+def prepago(mes, monto, modo="plazo"):
+    # modo "plazo": mantiene el dividendo y acorta el crédito;
+    # modo "dividendo": mantiene la fecha de término y baja la cuota
+    return Evento(mes, "prepago", monto, modo)
+
+
+def cambio_tasa(mes, tasa_anual):
+    return Evento(mes, "tasa", tasa_anual)
+
+
+def cambio_seguro(mes, seguro_mensual):
+    return Evento(mes, "seguro", seguro_mensual)
+
+
+def _cuota(saldo, r, meses):
+    if saldo <= 0 or meses <= 0:
+        return 0.0
+    return saldo * r / (1 - (1 + r) ** -meses) if r > 0 else saldo / meses
+
+
+def _meses_para_pagar(saldo, r, cuota):
+    # Meses (fraccionarios) hasta dejar el saldo en cero con la cuota dada
+    if saldo <= 0:
+        return 0.0
+    if r == 0:
+        return saldo / cuota
+    if cuota <= saldo * r:
+        return math.inf
+    return -math.log(1 - saldo * r / cuota) / math.log1p(r)
+
+
+def _saldo_tras(saldo, r, cuota, k):
+    if r == 0:
+        return saldo - cuota * k
+    crec = (1 + r) ** k
+    return saldo * crec - cuota * (crec - 1) / r
+
+
+def _interes_cierre(saldo, r, cuota, k):
+    # Interés de un tramo que termina en el mes k con el último pago parcial
+    saldo_previo = _saldo_tras(saldo, r, cuota, k - 1)
+    return cuota * (k - 1) - (saldo - saldo_previo) + saldo_previo * r
+
+
+def simular_eventos(credito_uf, tasa_anual, plazo, eventos=(), seguro_mensual=0.0):
+    """Recorre el crédito por tramos cerrados entre eventos.
+
+    Devuelve un dict con la lista de `Tramo`, el mes de término y los totales
+    (interés, capital, prepagos en UF y seguro en CLP).
+    """
+    n = plazo * 12
+    eventos = sorted((e for e in eventos if 0 <= e.mes < n), key=lambda e: e.mes)
+    saldo = float(max(credito_uf, 0))
+    tasa = tasa_anual
+    r = tasa_mensual(tasa)
+    seguro = seguro_mensual
+    fin = n
+    cuota = _cuota(saldo, r, fin)
+    mes = 0
+    tramos = []
+    prepagos_total = 0.0
+
+    def avanzar(hasta):
+        nonlocal saldo, mes
+        k = hasta - mes
+        if k <= 0 or saldo <= 0:
+            mes = max(mes, hasta)
+            return
+        restantes = _meses_para_pagar(saldo, r, cuota)
+        if restantes <= k + 1e-9:
+            # El crédito termina dentro del tramo: el último dividendo es parcial
+            k = max(math.ceil(restantes - 1e-9), 1)
+            saldo_final = 0.0
+            interes = _interes_cierre(saldo, r, cuota, k)
+        else:
+            saldo_final = _saldo_tras(saldo, r, cuota, k)
+            interes = cuota * k - (saldo - saldo_final)
+        tramos.append(Tramo(mes + 1, mes + k, tasa, cuota, seguro, saldo, saldo_final, interes, saldo - saldo_final))
+        saldo = saldo_final
+        mes += k
+
+    for e in eventos:
+        avanzar(e.mes)
+        if saldo <= 0:
+            break
+        if e.tipo == "prepago":
+            monto = min(float(e.valor), saldo)
+            saldo -= monto
+            prepagos_total += monto
+            if e.modo == "dividendo":
+                cuota = _cuota(saldo, r, fin - mes)
+            elif saldo > 0:
+                fin = mes + math.ceil(_meses_para_pagar(saldo, r, cuota) - 1e-9)
+        elif e.tipo == "tasa":
+            tasa = e.valor
+            r = tasa_mensual(tasa)
+            cuota = _cuota(saldo, r, fin - mes)
+        elif e.tipo == "seguro":
+            seguro = e.valor
+        else:
+            raise ValueError(f"Tipo de evento desconocido: {e.tipo}")
+    avanzar(fin)
+
+    ultimo_mes = tramos[-1].hasta if tramos else 0
+    return {
+        "tramos": tramos,
+        "mes_termino": ultimo_mes,
+        "interes_total": sum(t.interes for t in tramos),
+        "capital_total": sum(t.capital for t in tramos),
+        "prepagos_total": prepagos_total,
+        "seguro_total_clp": sum(t.seguro_clp * (t.hasta - t.desde + 1) for t in tramos),
+    }
+
+
+def expandir(resultado):
+    """Calendario mensual a partir de los tramos (vectorizado por tramo)."""
+    partes = {"mes": [], "cuota": [], "interes": [], "capital": [], "saldo": [], "tasa_anual": []}
+    for t in resultado["tramos"]:
+        k = np.arange(1, t.hasta - t.desde + 2)
+        r = float(tasa_mensual(t.tasa_anual))
+        crec = (1 + r) ** k
+        saldo = np.maximum(t.saldo_inicial * crec - t.cuota_uf * ((crec - 1) / r if r > 0 else k), 0.0)
+        saldo_previo = np.concatenate([[t.saldo_inicial], saldo[:-1]])
+        interes = saldo_previo * r
+        capital = saldo_previo - saldo
+        partes["mes"].append(t.desde - 1 + k)
+        partes["cuota"].append(interes + capital)
+        partes["interes"].append(interes)
+        partes["capital"].append(capital)
+        partes["saldo"].append(saldo)
+        partes["tasa_anual"].append(np.full(len(k), t.tasa_anual))
+    return {c: np.concatenate(v) if v else np.array([]) for c, v in partes.items()}
+
+
+def comparar_estrategias(credito_uf, tasa_anual, plazo, estrategias, seguro_mensual=0.0):
+    # Ordena estrategias {nombre: eventos} por interés total pagado
+    resultados = [
+        (nombre, simular_eventos(credito_uf, tasa_anual, plazo, eventos, seguro_mensual))
+        for nombre, eventos in estrategias.items()
+    ]
+    return sorted(resultados, key=lambda x: x[1]["interes_total"])
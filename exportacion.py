@@ -0,0 +1,76 @@
+import io
+
+import numpy as np
+
+# --- Vista paginada y exportación de la tabla de amortización ---
+# La vista sólo arma la página visible y las exportaciones se generan recién
+# cuando el usuario las pide. Los agregados por mes, trimestre o año vienen de
+# `indice.IndiceCalendario.rollup`.
+
+NIVELES = {"mes": "Mes", "trimestre": "Trimestre", "anio": "Año"}
+FORMATOS = {
+    "csv": ("text/csv", "amortizacion.csv"),
+    "parquet": ("application/octet-stream", "amortizacion.parquet"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "amortizacion.xlsx"),
+}
+
+
+def numero_paginas(agregada, tamano):
+    return max(-(-len(agregada["periodo"]) // tamano), 1)
+
+
+def pagina(agregada, nivel, numero, tamano, uf_clp):
+    # Sólo las filas visibles llegan a un DataFrame
+    import pandas as pd
+
+    i = (numero - 1) * tamano
+    s = slice(i, i + tamano)
+    return pd.DataFrame({
+        NIVELES[nivel]: agregada["periodo"][s],
+        "Capital Pagado UF": agregada["capital"][s],
+        "Interés Pagado UF": agregada["interes"][s],
+        "Saldo Restante UF": agregada["saldo"][s],
+        "Saldo Restante CLP": agregada["saldo"][s] * uf_clp,
+    })
+
+
+def columnas(tabla, uf_clp):
+    return {
+        "Mes": tabla["mes"],
+        "Año": tabla["anio"],
+        "Capital Pagado UF": tabla["capital"],
+        "Interés Pagado UF": tabla["interes"],
+        "Saldo Restante UF": tabla["saldo"],
+        "Capital Pagado CLP": tabla["capital"] * uf_clp,
+        "Interés Pagado CLP": tabla["interes"] * uf_clp,
+        "Saldo Restante CLP": tabla["saldo"] * uf_clp,
+    }
+
+
+def iterar_csv(tabla, uf_clp, bloque=1_000):
+    # CSV por bloques de filas, sin armar un DataFrame completo
+    cols = columnas(tabla, uf_clp)
+    yield ",".join(cols) + "\n"
+    datos = np.column_stack([np.asarray(v, dtype=float) for v in cols.values()])
+    formato = ",".join(["%d", "%d"] + ["%.6f"] * (datos.shape[1] - 2))
+    for i in range(0, len(datos), bloque):
+        buf = io.StringIO()
+        np.savetxt(buf, datos[i:i + bloque], fmt=formato)
+        yield buf.getvalue()
+
+
+def exportar(tabla, uf_clp, formato="csv"):
+    if formato == "csv":
+        return "".join(iterar_csv(tabla, uf_clp)).encode("utf-8")
+
+    import pandas as pd
+
+    df = pd.DataFrame(columnas(tabla, uf_clp))
+    buf = io.BytesIO()
+    if formato == "parquet":
+        df.to_parquet(buf, index=False)
+    elif formato == "xlsx":
+        df.to_excel(buf, index=False, sheet_name="Amortización")
+    else:
+        raise ValueError(f"Formato no soportado: {formato}")
+    return buf.getvalue()
@@ -0,0 +1,116 @@
+import os
+import threading
+
+import numpy as np
+
+# --- Payload de los gráficos ---
+# Cada figura viaja completa por el websocket en cada rerun. Antes de
+# entregarla se compactan sus arreglos (enteros o float32 cuando la
+# diferencia no se ve con los decimales del gráfico) y, si aun así supera el
+# presupuesto en bytes, las líneas largas se reducen con LTTB (Largest
+# Triangle Three Buckets), que conserva la forma de la curva. Las figuras con
+# muchos puntos usan trazas WebGL (Scattergl).
+
+PRESUPUESTO_BYTES = int(os.environ.get("SIMULADOR_PRESUPUESTO_GRAFICO_KB", "48")) * 1024
+UMBRAL_WEBGL = 1000
+PUNTOS_MINIMOS = 60
+
+_lock = threading.Lock()
+_tamanos = {}
+
+
+def lttb(x, y, umbral):
+    """Índices de los `umbral` puntos que LTTB conserva de la serie (x, y)."""
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype("datetime64[ns]").astype(np.int64)
+    x, y = x.astype(float), np.asarray(y, dtype=float)
+    n = len(x)
+    if umbral >= n or umbral < 3:
+        return np.arange(n)
+    # Primer y último punto fijos; el resto en umbral - 2 baldes
+    bordes = np.linspace(1, n - 1, umbral - 1).astype(int)
+    indices = np.empty(umbral, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(umbral - 2):
+        ini, fin = bordes[i], bordes[i + 1]
+        sig_fin = bordes[i + 2] if i + 2 < len(bordes) else n
+        cx, cy = x[fin:sig_fin].mean(), y[fin:sig_fin].mean()
+        # Se elige el punto del balde que forma el triángulo más grande con el
+        # punto anterior elegido y el promedio del balde siguiente
+        area = np.abs((x[a] - cx) * (y[ini:fin] - y[a]) - (x[a] - x[ini:fin]) * (cy - y[a]))
+        a = ini + int(area.argmax())
+        indices[i + 1] = a
+    return indices
+
+
+def traza_linea(webgl, **kw):
+    import plotly.graph_objects as go
+
+    return go.Scattergl(**kw) if webgl else go.Scatter(**kw)
+
+
+def usar_webgl(puntos):
+    # WebGL dibuja miles de puntos sin saturar el DOM del navegador
+    return puntos > UMBRAL_WEBGL
+
+
+def _compactar(valores, decimales):
+    v = np.asarray(valores)
+    if v.dtype.kind != "f":
+        return valores
+    v = np.round(v, decimales)
+    if decimales == 0 and np.isfinite(v).all() and np.abs(v).max(initial=0) < 2**31:
+        return v.astype(np.int32)
+    v32 = v.astype(np.float32)
+    # float32 sólo si la diferencia queda bajo la resolución que se muestra
+    if np.nanmax(np.abs(v32 - v), initial=0) <= 0.5 * 10.0**-decimales:
+        return v32
+    return v
+
+
+def _es_linea(traza):
+    return traza.type in ("scatter", "scattergl") and traza.x is not None and traza.y is not None
+
+
+def _reducir(fig, puntos):
+    reducidas = False
+    for traza in fig.data:
+        if _es_linea(traza) and len(traza.y) > puntos:
+            i = lttb(traza.x, traza.y, puntos)
+            cambios = {"x": np.asarray(traza.x)[i], "y": np.asarray(traza.y)[i]}
+            if traza.customdata is not None:
+                cambios["customdata"] = np.asarray(traza.customdata)[i]
+            traza.update(cambios)
+            reducidas = True
+    return reducidas
+
+
+def preparar(fig, nombre, decimales=2, presupuesto=None):
+    """Compacta la figura y la ajusta al presupuesto de bytes; registra su tamaño.
+
+    Las figuras salen de funciones memoizadas: esto corre una vez por figura.
+    """
+    presupuesto = presupuesto or PRESUPUESTO_BYTES
+    for traza in fig.data:
+        for campo in ("y", "z"):
+            if campo in traza and traza[campo] is not None:
+                traza[campo] = _compactar(traza[campo], decimales)
+    tamano = len(fig.to_json())
+    largo = max((len(t.y) for t in fig.data if _es_linea(t)), default=0)
+    while tamano > presupuesto and largo > PUNTOS_MINIMOS:
+        largo = max(largo // 2, PUNTOS_MINIMOS)
+        if not _reducir(fig, largo):
+            break
+        tamano = len(fig.to_json())
+    puntos = sum(np.size(t[c]) for t in fig.data for c in ("y", "z") if c in t and t[c] is not None)
+    with _lock:
+        _tamanos[nombre] = {"bytes": tamano, "puntos": puntos}
+    return fig
+
+
+def tamanos():
+    # Último tamaño entregado por gráfico, para el panel de rendimiento
+    with _lock:
+        return dict(_tamanos)
@@ -0,0 +1,221 @@
+import argparse
+import csv
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import requests
+
+from indicadores import URL_MINDICADOR
+
+# --- Series históricas de UF, IPC y TPM ---
+# Un proceso de ingesta baja las series por año y las guarda como arreglos
+# densos .npy (UF diaria, IPC y TPM mensuales) más un índice con la fecha de
+# inicio de cada serie. Se abren con memmap: una fecha se traduce a posición
+# restando el inicio, así cualquier lote de fechas se resuelve de una vez.
+#
+#   python historico.py ingerir --desde 2000            # desde mindicador.cl
+#   python historico.py ingerir --sin-conexion          # respaldo local aproximado
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+RUTA_ALMACEN = os.environ.get("SIMULADOR_HISTORICO", os.path.join(RAIZ, ".cache", "historico"))
+RUTA_RESPALDO = os.path.join(RAIZ, "datos", "historico_anual.csv")
+PASOS = {"uf": "D", "ipc": "M", "tpm": "M"}
+
+
+def fuente_mindicador_historica(indicador, anio, timeout=10.0):
+    r = requests.get(f"{URL_MINDICADOR}/{indicador}/{anio}", timeout=timeout)
+    r.raise_for_status()
+    # Las fechas vienen en UTC a medianoche de Chile: basta la parte de la fecha
+    return [(d["fecha"][:10], float(d["valor"])) for d in r.json()["serie"]]
+
+
+def fuente_respaldo(ruta=RUTA_RESPALDO):
+    # Series aproximadas desde anclas anuales, para trabajar sin conexión:
+    # UF interpolada geométricamente entre cada 1 de enero, IPC mensual
+    # equivalente al anual y TPM constante dentro del año.
+    with open(ruta, encoding="utf-8") as f:
+        filas = list(csv.DictReader(linea for linea in f if not linea.startswith("#")))
+    anclas = {int(f["anio"]): f for f in filas}
+
+    def fuente(indicador, anio, timeout=None):
+        fila, siguiente = anclas.get(anio), anclas.get(anio + 1)
+        if fila is None or not fila[indicador]:
+            return []
+        if indicador != "uf":
+            meses = np.arange(f"{anio}-01", f"{anio + 1}-01", dtype="datetime64[M]")
+            valor = float(fila[indicador])
+            if indicador == "ipc":
+                valor = ((1 + valor / 100) ** (1 / 12) - 1) * 100
+            return [(str(m.astype("datetime64[D]")), valor) for m in meses]
+        if siguiente is None:
+            return [(f"{anio}-01-01", float(fila["uf"]))]
+        dias = np.arange(f"{anio}-01-01", f"{anio + 1}-01-01", dtype="datetime64[D]")
+        razon = float(siguiente["uf"]) / float(fila["uf"])
+        valores = float(fila["uf"]) * razon ** (np.arange(len(dias)) / len(dias))
+        return list(zip(dias.astype(str), valores))
+    return fuente
+
+
+def _serie_densa(puntos, paso):
+    fechas = np.array([p[0] for p in puntos], dtype=f"datetime64[{paso}]")
+    valores = np.array([p[1] for p in puntos], dtype=float)
+    inicio = fechas.min()
+    densa = np.full(int((fechas.max() - inicio).astype(np.int64)) + 1, np.nan)
+    densa[(fechas - inicio).astype(int)] = valores
+    # Días o meses sin publicación toman el último valor conocido
+    ultimo = np.maximum.accumulate(np.where(np.isnan(densa), 0, np.arange(len(densa))))
+    return inicio, densa[ultimo]
+
+
+class AlmacenHistorico:
+    def __init__(self, ruta=RUTA_ALMACEN):
+        self.ruta = ruta
+        self.indice = {}
+        self._series = {}
+        self._cargar()
+
+    def _cargar(self):
+        try:
+            with open(os.path.join(self.ruta, "indice.json"), encoding="utf-8") as f:
+                self.indice = json.load(f)
+            self._series = {s: np.load(os.path.join(self.ruta, f"{s}.npy"), mmap_mode="r")
+                            for s in self.indice["series"]}
+        except (OSError, ValueError, KeyError):
+            self.indice, self._series = {}, {}
+
+    def disponible(self, serie="uf"):
+        return serie in self._series
+
+    def rango(self, serie):
+        info = self.indice["series"][serie]
+        inicio = np.datetime64(info["inicio"], PASOS[serie])
+        return inicio, inicio + len(self._series[serie]) - 1
+
+    def valores(self, serie, fechas):
+        """Valor de la serie en cada fecha (NaN fuera del rango guardado)."""
+        inicio, _ = self.rango(serie)
+        pos = (np.asarray(fechas, dtype=f"datetime64[{PASOS[serie]}]") - inicio).astype(np.int64)
+        dentro = (pos >= 0) & (pos < len(self._series[serie]))
+        salida = np.full(pos.shape, np.nan)
+        salida[dentro] = self._series[serie][pos[dentro]]
+        return salida
+
+    def guardar(self, series, fuente):
+        os.makedirs(self.ruta, exist_ok=True)
+        indice = {"fuente": fuente, "fecha": time.time(), "series": {}}
+        for serie, (inicio, densa) in series.items():
+            tmp = os.path.join(self.ruta, f"{serie}.tmp.npy")
+            np.save(tmp, densa)
+            os.replace(tmp, os.path.join(self.ruta, f"{serie}.npy"))
+            indice["series"][serie] = {"inicio": str(inicio), "n": len(densa)}
+        tmp = os.path.join(self.ruta, "indice.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(indice, f)
+        os.replace(tmp, os.path.join(self.ruta, "indice.json"))
+        self._cargar()
+
+
+def ingerir(desde=2000, hasta=None, fuente=None, ruta=RUTA_ALMACEN, nombre_fuente="mindicador"):
+    hasta = hasta or time.localtime().tm_year
+    fuente = fuente or fuente_mindicador_historica
+    series = {}
+    for serie, paso in PASOS.items():
+        puntos = [p for anio in range(desde, hasta + 1) for p in fuente(serie, anio)]
+        if puntos:
+            series[serie] = _serie_densa(puntos, paso)
+    almacen = AlmacenHistorico(ruta)
+    almacen.guardar(series, nombre_fuente)
+    return almacen
+
+
+def backtest(cuota_uf, fecha_inicio, almacen, seguro_mensual=0.0, inflacion_proyectada=0.03):
+    """Precio en CLP de un calendario de cuotas en UF contra la UF observada.
+
+    La primera cuota se paga un mes después de `fecha_inicio`, el mismo día
+    (máximo 28). Las cuotas posteriores al último dato (y la UF de firma, si
+    también lo es) se proyectan con `inflacion_proyectada`; las cuotas
+    proyectadas quedan marcadas en `observado`.
+    """
+    cuota_uf = np.asarray(cuota_uf, dtype=float)
+    inicio = np.datetime64(fecha_inicio, "D")
+    desde_uf, hasta_uf = almacen.rango("uf")
+    if inicio < desde_uf:
+        raise ValueError(f"No hay UF histórica antes de {desde_uf}")
+    mes_inicio = inicio.astype("datetime64[M]")
+    dia = min(int((inicio - mes_inicio.astype("datetime64[D]")).astype(np.int64)), 27)
+    fechas = (mes_inicio + np.arange(1, len(cuota_uf) + 1)).astype("datetime64[D]") + dia
+
+    def proyectar(desde):
+        anios = (desde - hasta_uf).astype(float) / 365.25
+        return almacen.valores("uf", [hasta_uf])[0] * (1 + inflacion_proyectada) ** anios
+
+    uf = almacen.valores("uf", fechas)
+    observado = ~np.isnan(uf)
+    uf[~observado] = proyectar(fechas[~observado])
+    # Una firma posterior al último dato también parte de una UF proyectada
+    uf_inicio = float(almacen.valores("uf", [inicio])[0]) if inicio <= hasta_uf else float(proyectar(inicio))
+
+    pago_clp = cuota_uf * uf + seguro_mensual
+    resultado = {
+        "fechas": fechas,
+        "uf": uf,
+        "pago_clp": pago_clp,
+        "observado": observado,
+        "uf_inicio": uf_inicio,
+        "total_clp": float(pago_clp.sum()),
+        # Lo que se habría pagado si la UF no se hubiera movido desde el inicio
+        "total_clp_uf_fija": float((cuota_uf * uf_inicio + seguro_mensual).sum()),
+        "tpm_inicio": float(almacen.valores("tpm", [inicio])[0]) if almacen.disponible("tpm") else float("nan"),
+    }
+    if almacen.disponible("ipc"):
+        ipc = almacen.valores("ipc", fechas[observado])
+        resultado["ipc_acumulado"] = float(np.prod(1 + np.nan_to_num(ipc) / 100) - 1)
+    return resultado
+
+
+_almacen = None
+_almacen_lock = threading.Lock()
+
+
+def almacen():
+    # Almacén compartido; si nunca se ingirió, se arma con el respaldo local
+    global _almacen
+    with _almacen_lock:
+        if _almacen is None:
+            _almacen = AlmacenHistorico()
+            if not _almacen.disponible():
+                _almacen = ingerir(desde=2000, hasta=2025, fuente=fuente_respaldo(), nombre_fuente="respaldo")
+        return _almacen
+
+
+def configurar(ruta=RUTA_ALMACEN):
+    global _almacen
+    with _almacen_lock:
+        _almacen = AlmacenHistorico(ruta)
+        return _almacen
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Series históricas de UF, IPC y TPM.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p = sub.add_parser("ingerir", help="Descarga las series y arma el almacén local")
+    p.add_argument("--desde", type=int, default=2000, help="Primer año")
+    p.add_argument("--hasta", type=int, default=None, help="Último año (por defecto, el actual)")
+    p.add_argument("--ruta", default=RUTA_ALMACEN, help="Carpeta del almacén")
+    p.add_argument("--sin-conexion", action="store_true", help="Usa el respaldo local aproximado")
+    args = parser.parse_args(argv)
+
+    if args.sin_conexion:
+        a = ingerir(args.desde, args.hasta or 2025, fuente_respaldo(), args.ruta, "respaldo")
+    else:
+        a = ingerir(args.desde, args.hasta, ruta=args.ruta)
+    for serie in a.indice["series"]:
+        desde, hasta = a.rango(serie)
+        print(f"{serie}: {desde} a {hasta} ({a.indice['series'][serie]['n']} valores)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import json
+import os
+import threading
+import time
+
+import requests
+
+# --- Indicadores económicos con caché compartida ---
+# Un único proveedor por proceso atiende a todas las sesiones de Streamlit:
+# sirve el último valor bueno desde memoria, lo persiste en disco para
+# sobrevivir reinicios y lo refresca en segundo plano cuando vence el TTL.
+
+URL_MINDICADOR = "https://mindicador.cl/api"
+INDICADORES = ("uf", "dolar", "ipc", "tpm")
+VALORES_POR_DEFECTO = {"uf": 36000.0, "dolar": None, "ipc": None, "tpm": 6.0}
+RUTA_SNAPSHOT = os.environ.get(
+    "SIMULADOR_INDICADORES_SNAPSHOT",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "indicadores.json"),
+)
+
+
+def fuente_mindicador(timeout=3.0):
+    r = requests.get(URL_MINDICADOR, timeout=timeout)
+    r.raise_for_status()
+    datos = r.json()
+    return {k: float(datos[k]["valor"]) for k in INDICADORES}
+
+
+def fuente_local(valores):
+    # Fuente fija para pruebas sin conexión
+    def fuente(timeout=None):
+        return dict(valores)
+    return fuente
+
+
+class ProveedorIndicadores:
+    def __init__(self, fuente=fuente_mindicador, ttl=3600, timeout=3.0, ruta_snapshot=RUTA_SNAPSHOT):
+        self.fuente = fuente
+        self.ttl = ttl
+        self.timeout = timeout
+        self.ruta_snapshot = ruta_snapshot
+        self._lock = threading.Lock()
+        self._refrescando = False
+        self._valores = None
+        self._fecha = 0.0
+        self._intentado = False
+        self._cargar_snapshot()
+
+    def obtener(self):
+        """Devuelve (valores, origen, fecha) sin bloquear salvo en frío.
+
+        `origen` es "en_linea", "cache" (valor vencido mientras se refresca)
+        o "defecto" cuando nunca se pudo obtener un valor.
+        """
+        with self._lock:
+            valores, fecha = self._valores, self._fecha
+        if valores is None:
+            if self._intentado:
+                # La fuente ya falló: reintenta sin bloquear la página
+                self._refrescar_en_segundo_plano()
+                return dict(VALORES_POR_DEFECTO), "defecto", None
+            # Arranque en frío sin snapshot: una sola consulta con timeout
+            self._refrescar()
+            with self._lock:
+                valores, fecha = self._valores, self._fecha
+            if valores is None:
+                return dict(VALORES_POR_DEFECTO), "defecto", None
+            return dict(valores), "en_linea", fecha
+        if time.time() - fecha > self.ttl:
+            self._refrescar_en_segundo_plano()
+            return dict(valores), "cache", fecha
+        return dict(valores), "en_linea", fecha
+
+    def _refrescar_en_segundo_plano(self):
+        with self._lock:
+            if self._refrescando:
+                return
+            self._refrescando = True
+        threading.Thread(target=self._refrescar, daemon=True).start()
+
+    def _refrescar(self):
+        try:
+            valores = self.fuente(timeout=self.timeout)
+        except Exception:
+            valores = None
+        with self._lock:
+            self._refrescando = False
+            self._intentado = True
+            if valores:
+                self._valores, self._fecha = valores, time.time()
+        if valores:
+            self._guardar_snapshot(valores, self._fecha)
+
+    def _cargar_snapshot(self):
+        if not self.ruta_snapshot:
+            return
+        try:
+            with open(self.ruta_snapshot, encoding="utf-8") as f:
+                datos = json.load(f)
+            self._valores = {k: float(datos["valores"][k]) for k in INDICADORES}
+            self._fecha = float(datos["fecha"])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    def _guardar_snapshot(self, valores, fecha):
+        if not self.ruta_snapshot:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.ruta_snapshot), exist_ok=True)
+            tmp = self.ruta_snapshot + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"valores": valores, "fecha": fecha}, f)
+            os.replace(tmp, self.ruta_snapshot)
+        except OSError:
+            pass
+
+
+_proveedor = None
+_proveedor_lock = threading.Lock()
+
+
+def proveedor():
+    # Proveedor compartido por todas las sesiones del proceso
+    global _proveedor
+    with _proveedor_lock:
+        if _proveedor is None:
+            _proveedor = ProveedorIndicadores()
+        return _proveedor
+
+
+def configurar(fuente=None, **kwargs):
+    # Reemplaza el proveedor compartido (p. ej. con `fuente_local` sin conexión)
+    global _proveedor
+    with _proveedor_lock:
+        _proveedor = ProveedorIndicadores(fuente=fuente or fuente_mindicador, **kwargs)
+        return _proveedor
+
+
+def obtener_indicadores():
+    return proveedor().obtener()
@@ -0,0 +1,83 @@
+import numpy as np
+
+# --- Índice de acumulados sobre el calendario ---
+# Sumas prefijas de capital e interés más el saldo por mes, para responder
+# consultas de rango en O(1) y armar los agregados por trimestre o año sin
+# volver a recorrer la tabla. Gráficos, diagnóstico y exportación leen de aquí.
+
+MESES_POR_NIVEL = {"mes": 1, "trimestre": 3, "anio": 12}
+
+
+class IndiceCalendario:
+    __slots__ = ("n_meses", "_capital", "_interes", "_saldo", "_mes_cruce", "_rollups")
+
+    def __init__(self, tabla, saldo_inicial=None):
+        capital = np.asarray(tabla["capital"], dtype=float)
+        interes = np.asarray(tabla["interes"], dtype=float)
+        saldo = np.asarray(tabla["saldo"], dtype=float)
+        self.n_meses = len(capital)
+        if saldo_inicial is None:
+            saldo_inicial = saldo[0] + capital[0] if self.n_meses else 0.0
+        # Posición 0 = antes del primer mes, posición m = al cierre del mes m
+        self._capital = np.concatenate([[0.0], np.cumsum(capital)])
+        self._interes = np.concatenate([[0.0], np.cumsum(interes)])
+        self._saldo = np.concatenate([[saldo_inicial], saldo])
+        cruce = np.flatnonzero(capital > interes)
+        self._mes_cruce = int(cruce[0]) + 1 if len(cruce) else None
+        self._rollups = {}
+
+    def _rango(self, desde, hasta):
+        desde = np.clip(desde, 1, self.n_meses + 1)
+        hasta = np.clip(hasta, 0, self.n_meses)
+        return desde - 1, np.maximum(hasta, desde - 1)
+
+    def interes_entre(self, desde, hasta):
+        # Interés pagado entre los meses `desde` y `hasta`, ambos incluidos
+        a, b = self._rango(desde, hasta)
+        return self._interes[b] - self._interes[a]
+
+    def capital_entre(self, desde, hasta):
+        a, b = self._rango(desde, hasta)
+        return self._capital[b] - self._capital[a]
+
+    def saldo_en(self, mes):
+        # Saldo al cierre del mes (0 = monto inicial del crédito)
+        return self._saldo[np.clip(mes, 0, self.n_meses)]
+
+    @property
+    def nbytes(self):
+        return self._capital.nbytes + self._interes.nbytes + self._saldo.nbytes
+
+    @property
+    def interes_total(self):
+        return float(self._interes[-1])
+
+    @property
+    def capital_total(self):
+        return float(self._capital[-1])
+
+    @property
+    def mes_cruce(self):
+        # Primer mes en que el capital de la cuota supera al interés, o None
+        return self._mes_cruce
+
+    @property
+    def anio_cruce(self):
+        return (self._mes_cruce - 1) // 12 + 1 if self._mes_cruce else None
+
+    def rollup(self, nivel="anio"):
+        """Capital, interés y saldo de cierre por período ("mes", "trimestre" o "anio")."""
+        if nivel not in self._rollups:
+            paso = MESES_POR_NIVEL[nivel]
+            fines = np.append(np.arange(paso, self.n_meses, paso), self.n_meses) if self.n_meses else np.array([], int)
+            inicios = np.concatenate([[0], fines[:-1]])
+            rollup = {
+                "periodo": np.arange(1, len(fines) + 1),
+                "capital": self._capital[fines] - self._capital[inicios],
+                "interes": self._interes[fines] - self._interes[inicios],
+                "saldo": self._saldo[fines],
+            }
+            for v in rollup.values():
+                v.flags.writeable = False
+            self._rollups[nivel] = rollup
+        return self._rollups[nivel]
@@ -0,0 +1,108 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+
+import numpy as np
+
+# --- Instrumentación por sección ---
+# Mide cuánto tarda cada sección de app.py en cada rerun y guarda una ventana
+# móvil por sección en memoria del proceso (compartida entre sesiones).
+# Desactivada, `seccion()` devuelve un contexto vacío y no mide nada.
+
+VENTANA = 500
+PERCENTILES = (50, 95, 99)
+
+_activo = os.environ.get("SIMULADOR_PERF", "") not in ("", "0")
+_lock = threading.Lock()
+_muestras = {}
+_acumulado = {}
+_NULO = nullcontext()
+
+
+def activo():
+    return _activo
+
+
+def activar(valor=True):
+    global _activo
+    _activo = bool(valor)
+
+
+def registrar(nombre, segundos):
+    with _lock:
+        muestras = _muestras.get(nombre)
+        if muestras is None:
+            muestras = _muestras[nombre] = deque(maxlen=VENTANA)
+        muestras.append(segundos)
+        conteo, suma = _acumulado.get(nombre, (0, 0.0))
+        _acumulado[nombre] = (conteo + 1, suma + segundos)
+
+
+class _Cronometro:
+    __slots__ = ("nombre", "inicio")
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        registrar(self.nombre, time.perf_counter() - self.inicio)
+        return False
+
+
+def seccion(nombre, activa=False):
+    # with seccion("graficos"): ...; `activa` mide aunque el switch global
+    # (SIMULADOR_PERF) esté apagado, p. ej. en una sesión con ?debug=1
+    return _Cronometro(nombre) if _activo or activa else _NULO
+
+
+def resumen():
+    """Percentiles (ms) de la ventana móvil y acumulados por sección.
+
+    {nombre: {"n", "p50", "p95", "p99", "conteo", "suma_ms"}}; `n` es el
+    tamaño de la ventana y `conteo`/`suma_ms` cubren toda la vida del proceso.
+    """
+    with _lock:
+        copia = {nombre: np.fromiter(m, float) for nombre, m in _muestras.items()}
+        acumulado = dict(_acumulado)
+    datos = {}
+    for nombre, m in copia.items():
+        p = np.percentile(m, PERCENTILES) * 1000
+        conteo, suma = acumulado[nombre]
+        datos[nombre] = {
+            "n": len(m),
+            **{f"p{q}": float(v) for q, v in zip(PERCENTILES, p)},
+            "conteo": conteo,
+            "suma_ms": suma * 1000,
+        }
+    return datos
+
+
+def limpiar():
+    with _lock:
+        _muestras.clear()
+        _acumulado.clear()
+
+
+def exportar_json():
+    return json.dumps(resumen(), indent=2, ensure_ascii=False)
+
+
+def exportar_prometheus():
+    # Formato de texto de Prometheus, tipo summary en segundos
+    lineas = [
+        "# HELP simulador_seccion_segundos Duración de cada sección de app.py por rerun.",
+        "# TYPE simulador_seccion_segundos summary",
+    ]
+    for nombre, d in sorted(resumen().items()):
+        for q in PERCENTILES:
+            lineas.append(f'simulador_seccion_segundos{{seccion="{nombre}",quantile="{q / 100}"}} {d[f"p{q}"] / 1000:.6f}')
+        lineas.append(f'simulador_seccion_segundos_sum{{seccion="{nombre}"}} {d["suma_ms"] / 1000:.6f}')
+        lineas.append(f'simulador_seccion_segundos_count{{seccion="{nombre}"}} {d["conteo"]}')
+    return "\n".join(lineas) + "\n"
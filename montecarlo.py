@@ -0,0 +1,93 @@
+import numpy as np
+
+from amortizacion import tabla_credito, tasa_mensual
+
+# --- Monte Carlo de UF/IPC y tasa variable ---
+# Simula trayectorias mensuales de la UF (y opcionalmente de la tasa) como
+# matrices trayectorias × meses, por bloques y sin ciclos por trayectoria.
+
+PERCENTILES = (5, 50, 95)
+
+
+def trayectorias_uf(uf_clp, inflacion, volatilidad, n_meses, n_trayectorias, rng):
+    # Inflación mensual log-normal: UF_k = UF_0 · exp(Σ g), g ~ N(μ, σ)
+    mu = np.log1p(inflacion) / 12
+    sigma = volatilidad / np.sqrt(12)
+    g = rng.normal(mu, sigma, size=(n_trayectorias, n_meses))
+    return uf_clp * np.exp(np.cumsum(g, axis=1))
+
+
+def pagos_tasa_variable(credito_uf, tasa_anual, plazo, vol_tasa, reajuste, n_trayectorias, rng,
+                        prepago_monto=0.0, prepago_ano=0):
+    # Dividendo en UF con reajuste de tasa cada `reajuste` meses sobre el saldo y
+    # el plazo vigentes. El prepago mantiene la cuota y acorta el plazo, como en
+    # el calendario de tasa fija (`tabla_credito`).
+    n_meses = plazo * 12
+    n_reajustes = -(-n_meses // reajuste)
+    shocks = rng.normal(0, vol_tasa, size=(n_trayectorias, n_reajustes))
+    shocks[:, 0] = 0
+    tasas = np.maximum(tasa_anual + np.cumsum(shocks, axis=1), 0)
+    r_mes = np.repeat(tasa_mensual(tasas), reajuste, axis=1)[:, :n_meses]
+
+    saldo = np.full(n_trayectorias, float(credito_uf))
+    pagos = np.empty((n_trayectorias, n_meses))
+    cuota = np.zeros(n_trayectorias)
+    # Mes (fraccionario) en que termina cada trayectoria con la cuota vigente
+    fin = np.full(n_trayectorias, float(n_meses))
+    for k in range(n_meses):
+        r = r_mes[:, k]
+        if k % reajuste == 0:
+            restantes = np.maximum(fin - k, 1.0)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                cuota = np.where(r > 0, saldo * r / (1 - (1 + r) ** -restantes), saldo / restantes)
+            cuota = np.where(saldo > 0, cuota, 0.0)
+        interes = saldo * r
+        pagos[:, k] = np.minimum(cuota, saldo + interes)
+        saldo = saldo + interes - pagos[:, k]
+        if prepago_monto and k + 1 == prepago_ano * 12:
+            saldo = np.maximum(saldo - prepago_monto, 0)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                meses = np.where(r > 0, -np.log1p(-saldo * r / cuota) / np.log1p(r), saldo / cuota)
+            fin = k + 1 + np.where(saldo > 0, meses, 0.0)
+    return pagos
+
+
+def simular(credito_uf, tasa_anual, plazo, uf_clp, seguro_mensual=0.0, ingreso_clp=None,
+            inflacion=0.03, volatilidad=0.01, n_trayectorias=10_000, semilla=None,
+            tasa_variable=False, vol_tasa=0.005, reajuste=12, prepago_monto=0.0, prepago_ano=0,
+            bloque=2_000):
+    """Bandas P5/P50/P95 del dividendo en CLP, el total pagado y la carga sobre el ingreso.
+
+    Con `tasa_variable` la tasa anual sigue un paseo aleatorio que se reajusta
+    cada `reajuste` meses; si no, el calendario en UF es fijo y sólo varía la UF.
+    """
+    rng = np.random.default_rng(semilla)
+    n_meses = plazo * 12
+    if not tasa_variable:
+        tabla = tabla_credito(credito_uf, tasa_anual, plazo, prepago_monto, prepago_ano)
+        pagos_fijos = tabla["capital"] + tabla["interes"]
+
+    dividendo_clp = np.empty((n_trayectorias, n_meses), dtype=np.float32)
+    total_clp = np.empty(n_trayectorias)
+    for i in range(0, n_trayectorias, bloque):
+        m = min(bloque, n_trayectorias - i)
+        uf = trayectorias_uf(uf_clp, inflacion, volatilidad, n_meses, m, rng)
+        if tasa_variable:
+            pagos = pagos_tasa_variable(credito_uf, tasa_anual, plazo, vol_tasa, reajuste, m, rng,
+                                        prepago_monto, prepago_ano)
+        else:
+            pagos = pagos_fijos
+        div = pagos * uf + np.where(pagos > 0, seguro_mensual, 0)
+        dividendo_clp[i:i + m] = div
+        total_clp[i:i + m] = div.sum(axis=1)
+
+    bandas_dividendo = np.percentile(dividendo_clp, PERCENTILES, axis=0)
+    resultado = {
+        "mes": np.arange(1, n_meses + 1),
+        "dividendo_clp": bandas_dividendo,
+        "total_clp": np.percentile(total_clp, PERCENTILES),
+        "semilla": semilla,
+    }
+    if ingreso_clp:
+        resultado["carga_ingreso"] = bandas_dividendo / ingreso_clp
+    return resultado
@@ -0,0 +1,182 @@
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+from cache_resultados import cache
+
+# --- Reporte PDF en segundo plano ---
+# El PDF (resumen, comparativa, diagnóstico, gráfico anual y calendario
+# completo) se arma en un pool de hilos para no bloquear el rerun. Los PDF
+# terminados quedan en la caché compartida por clave de escenario, y el
+# gráfico se renderiza una sola vez por calendario.
+
+_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="reporte_pdf")
+_lock = threading.Lock()
+_trabajos = {}
+_progreso = {}
+
+
+def _texto(valor):
+    # Las fuentes base de PDF son latin-1: se omiten emojis y símbolos
+    return str(valor).encode("latin-1", "ignore").decode("latin-1").strip()
+
+
+@lru_cache(maxsize=64)
+def _grafico_anual_png(clave_calendario, periodos, capital, interes):
+    # Figure + FigureCanvasAgg sin pyplot: su gestor global de figuras no es
+    # seguro entre los hilos del pool
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    periodos, capital, interes = np.asarray(periodos), np.asarray(capital), np.asarray(interes)
+    fig = Figure(figsize=(7.5, 3.2), dpi=110)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.bar(periodos, interes, color="orange", label="Interés")
+    ax.bar(periodos, capital, bottom=interes, color="teal", label="Capital")
+    ax.plot(periodos, capital + interes, color="royalblue", marker="o", markersize=3, label="Cuota total")
+    ax.set_xlabel("Año")
+    ax.set_ylabel("UF")
+    ax.set_title("Evolución anual: Interés vs Capital")
+    ax.legend(loc="upper right", fontsize=8)
+    fig.tight_layout()
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png")
+    return buf.getvalue()
+
+
+def generar_pdf(datos, progreso=None):
+    """Arma el PDF a partir de `datos` (ver `datos_reporte` en simulador.py)."""
+    from fpdf import FPDF
+
+    avisar = progreso or (lambda fraccion: None)
+    uf = datos["uf_clp"]
+    pdf = FPDF(format="A4")
+    pdf.set_auto_page_break(True, margin=15)
+    pdf.add_page()
+
+    pdf.set_font("Helvetica", "B", 16)
+    pdf.set_text_color(46, 134, 193)
+    pdf.cell(0, 10, "Simulador Hipotecario - Reporte", new_x="LMARGIN", new_y="NEXT", align="C")
+    pdf.set_text_color(0, 0, 0)
+    pdf.set_font("Helvetica", "", 9)
+    pdf.cell(0, 6, _texto(f"UF = ${uf:,.2f} CLP - generado el {datos['fecha']}"), new_x="LMARGIN", new_y="NEXT", align="C")
+    pdf.ln(3)
+
+    pdf.set_font("Helvetica", "B", 12)
+    pdf.cell(0, 8, "Resumen", new_x="LMARGIN", new_y="NEXT")
+    pdf.set_font("Helvetica", "", 10)
+    for etiqueta, valor in datos["resumen"]:
+        pdf.cell(90, 6, _texto(etiqueta))
+        pdf.cell(0, 6, _texto(valor), new_x="LMARGIN", new_y="NEXT")
+    avisar(0.15)
+
+    pdf.ln(3)
+    pdf.set_font("Helvetica", "B", 12)
+    pdf.cell(0, 8, "Comparativa de plazos", new_x="LMARGIN", new_y="NEXT")
+    comp = datos["comparativa"]
+    columnas = [("Plazo", 18), ("Dividendo UF", 28), ("Dividendo CLP", 34), ("Renta sugerida CLP", 38),
+                ("Intereses UF", 30), ("Total + pie UF", 32)]
+    pdf.set_font("Helvetica", "B", 8)
+    for titulo, ancho in columnas:
+        pdf.cell(ancho, 6, titulo, border=1, align="C")
+    pdf.ln()
+    pdf.set_font("Helvetica", "", 8)
+    for i, plazo in enumerate(comp["plazo"]):
+        simulado = int(plazo) == datos["plazo"]
+        pdf.set_fill_color(208, 233, 255)
+        valores = [f"{plazo} años", f"{comp['dividendo_uf'][i]:,.2f}", f"${comp['dividendo_clp'][i]:,.0f}",
+                   f"${comp['renta_sugerida_clp'][i]:,.0f}", f"{comp['interes_total_uf'][i]:,.2f}",
+                   f"{comp['monto_total_con_pie_uf'][i]:,.2f}"]
+        for (_, ancho), valor in zip(columnas, valores):
+            pdf.cell(ancho, 6, _texto(valor), border=1, align="R", fill=simulado)
+        pdf.ln()
+    avisar(0.3)
+
+    pdf.ln(3)
+    pdf.set_font("Helvetica", "B", 12)
+    pdf.cell(0, 8, "Diagnóstico financiero", new_x="LMARGIN", new_y="NEXT")
+    pdf.set_font("Helvetica", "", 9)
+    for d in datos["diagnosticos"]:
+        pdf.multi_cell(0, 5, "- " + _texto(d), new_x="LMARGIN", new_y="NEXT")
+    avisar(0.45)
+
+    anual = datos["anual"]
+    png = _grafico_anual_png(datos["clave_calendario"], tuple(anual["periodo"].tolist()),
+                             tuple(anual["capital"].tolist()), tuple(anual["interes"].tolist()))
+    pdf.ln(2)
+    pdf.image(io.BytesIO(png), w=pdf.epw)
+    avisar(0.6)
+
+    pdf.add_page()
+    pdf.set_font("Helvetica", "B", 12)
+    pdf.cell(0, 8, "Tabla de amortización", new_x="LMARGIN", new_y="NEXT")
+    columnas = [("Mes", 16), ("Año", 14), ("Capital UF", 30), ("Interés UF", 30), ("Saldo UF", 34), ("Saldo CLP", 40)]
+
+    def encabezado():
+        pdf.set_font("Helvetica", "B", 8)
+        for titulo, ancho in columnas:
+            pdf.cell(ancho, 5, _texto(titulo), border=1, align="C")
+        pdf.ln()
+        pdf.set_font("Helvetica", "", 7)
+
+    encabezado()
+    tabla = datos["tabla"]
+    n = len(tabla["mes"])
+    for i in range(n):
+        if pdf.will_page_break(5):
+            pdf.add_page()
+            encabezado()
+        fila = (f"{tabla['mes'][i]}", f"{tabla['anio'][i]}", f"{tabla['capital'][i]:,.2f}",
+                f"{tabla['interes'][i]:,.2f}", f"{tabla['saldo'][i]:,.2f}", f"${tabla['saldo'][i] * uf:,.0f}")
+        for (_, ancho), valor in zip(columnas, fila):
+            pdf.cell(ancho, 5, valor, border=1, align="R")
+        pdf.ln()
+        if i % 60 == 59:
+            avisar(0.6 + 0.4 * i / n)
+    avisar(1.0)
+    return bytes(pdf.output())
+
+
+def _ejecutar(clave_reporte, datos):
+    def avisar(fraccion):
+        _progreso[clave_reporte] = fraccion
+    try:
+        return cache.guardar(clave_reporte, generar_pdf(datos, avisar))
+    finally:
+        with _lock:
+            _progreso.pop(clave_reporte, None)
+
+
+def solicitar(clave_reporte, obtener_datos):
+    """Encola el reporte si no existe ni está en curso. `obtener_datos` se llama sólo si hace falta."""
+    with _lock:
+        trabajo = _trabajos.get(clave_reporte)
+        if trabajo is not None and not trabajo.done():
+            return
+        if cache.obtener(clave_reporte) is not None:
+            return
+        _progreso[clave_reporte] = 0.0
+        _trabajos[clave_reporte] = _pool.submit(_ejecutar, clave_reporte, obtener_datos())
+
+
+def estado(clave_reporte):
+    """("listo", bytes), ("en_curso", fracción), ("error", mensaje) o (None, None)."""
+    pdf = cache.obtener(clave_reporte)
+    if pdf is not None:
+        return "listo", pdf
+    with _lock:
+        trabajo = _trabajos.get(clave_reporte)
+        if trabajo is None:
+            return None, None
+        if not trabajo.done():
+            return "en_curso", _progreso.get(clave_reporte, 0.0)
+        _trabajos.pop(clave_reporte)
+    error = trabajo.exception()
+    if error is not None:
+        return "error", str(error)
+    # Terminó, pero la caché ya lo desalojó: se entrega el resultado del trabajo
+    return "listo", trabajo.result()
@@ -0,0 +1,60 @@
+import numpy as np
+
+from amortizacion import dividendo
+
+# --- Análisis de sensibilidad ---
+# Grilla densa plazo × tasa × pie calculada en un solo broadcast de NumPy.
+# Sólo números: el formato para mostrar se aplica en la capa de vista.
+
+PLAZOS = np.arange(1, 31)
+TASAS = np.round(np.arange(0.01, 0.10 + 1e-9, 0.0005), 4)
+PIES_PCT = np.round(np.arange(0.10, 0.50 + 1e-9, 0.01), 2)
+METRICAS = {
+    "dividendo_clp": "Dividendo mensual (CLP)",
+    "interes_total_uf": "Intereses totales (UF)",
+    "sueldo_requerido": "Sueldo requerido 25% (CLP)",
+}
+
+
+def calcular_grilla(precio_uf, total_beneficios, seguro_mensual, uf_clp,
+                    plazos=PLAZOS, tasas=TASAS, pies_pct=PIES_PCT):
+    """Métricas sobre la grilla completa, con ejes (plazo, tasa, pie)."""
+    plazos = np.asarray(plazos)
+    tasas = np.asarray(tasas, dtype=float)
+    pies_pct = np.asarray(pies_pct, dtype=float)
+    p = plazos[:, None, None]
+    t = tasas[None, :, None]
+    credito = np.maximum(precio_uf * (1 - pies_pct) - total_beneficios, 0)[None, None, :]
+
+    dividendo_uf = dividendo(credito, t, p)
+    dividendo_clp = dividendo_uf * uf_clp + seguro_mensual
+    return {
+        "plazo": plazos,
+        "tasa": tasas,
+        "pie_pct": pies_pct,
+        "credito_uf": credito[0, 0],
+        "dividendo_uf": dividendo_uf,
+        "dividendo_clp": dividendo_clp,
+        "interes_total_uf": dividendo_uf * (p * 12) - credito,
+        "sueldo_requerido": dividendo_clp / 0.25,
+    }
+
+
+def indice_cercano(eje, valor):
+    return int(np.abs(np.asarray(eje) - valor).argmin())
+
+
+def a_dataframe(grilla):
+    # Formato largo: una fila por celda, columnas numéricas ordenables
+    import pandas as pd
+
+    p, t, s = np.meshgrid(grilla["plazo"], grilla["tasa"], grilla["pie_pct"], indexing="ij")
+    return pd.DataFrame({
+        "plazo": p.ravel(),
+        "tasa": t.ravel(),
+        "pie_pct": s.ravel(),
+        "dividendo_uf": grilla["dividendo_uf"].ravel(),
+        "dividendo_clp": grilla["dividendo_clp"].ravel(),
+        "interes_total_uf": grilla["interes_total_uf"].ravel(),
+        "sueldo_requerido": grilla["sueldo_requerido"].ravel(),
+    })
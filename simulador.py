@@ -0,0 +1,475 @@
+from functools import lru_cache
+
+import numpy as np
+
+import asequibilidad
+import diagnostico
+import escenarios
+import eventos
+import exportacion
+import graficos
+import historico
+import montecarlo
+import sensibilidad
+from amortizacion import dividendo, tabla_credito
+from cache_resultados import cache, clave
+from indice import IndiceCalendario
+from instrumentacion import seccion
+
+# --- Núcleo del simulador ---
+# Funciones puras memoizadas por sus entradas reales. Streamlit re-ejecuta
+# app.py completo en cada interacción; con esta caché sólo se recalculan las
+# etapas cuyos argumentos cambiaron. pandas y plotly se importan al usarse.
+# Los calendarios van a la caché compartida por bytes (`cache_resultados`).
+# Las figuras se memoizan ya compactadas para el navegador (`graficos`).
+#
+# Los resultados se comparten entre llamadas: no deben modificarse.
+
+TAMANO_CACHE = 256
+PLAZOS_COMUNES = (15, 20, 25, 30)
+
+
+def _solo_lectura(arreglos):
+    for v in arreglos.values():
+        if isinstance(v, np.ndarray):
+            v.flags.writeable = False
+    return arreglos
+
+
+def _calcular_credito(credito_uf, tasa_anual, plazo, prepago_monto, prepago_ano):
+    tabla = tabla_credito(credito_uf, tasa_anual, plazo, prepago_monto, prepago_ano)
+    # Almacenamiento compacto: capital, interés y saldo en un solo arreglo
+    calendario = np.vstack([tabla["capital"], tabla["interes"], tabla["saldo"]])
+    calendario.flags.writeable = False
+    indice = IndiceCalendario(tabla, saldo_inicial=credito_uf)
+    return {
+        "dividendo_uf": float(dividendo(credito_uf, tasa_anual, plazo)),
+        "calendario": calendario,
+        "indice": indice,
+        "interes_total": indice.interes_total,
+        "capital_total": indice.capital_total,
+        "anio_salto": indice.anio_cruce,
+    }
+
+
+def _tabla(calendario):
+    mes = np.arange(1, calendario.shape[1] + 1)
+    return {"mes": mes, "anio": (mes - 1) // 12 + 1,
+            "capital": calendario[0], "interes": calendario[1], "saldo": calendario[2]}
+
+
+def simular_credito(credito_uf, tasa_anual, plazo, prepago_monto=0.0, prepago_ano=0):
+    # Todo en UF: no depende del valor de la UF ni del seguro
+    k = clave("credito", credito_uf=credito_uf, tasa_anual=tasa_anual, plazo=plazo,
+              prepago_monto=prepago_monto, prepago_ano=prepago_ano)
+    resultado = cache.obtener_o_calcular(
+        k, lambda: _calcular_credito(credito_uf, tasa_anual, plazo, prepago_monto, prepago_ano))
+    return {**resultado, "tabla": _tabla(resultado["calendario"])}
+
+
+def simular_escenario(precio_uf, pie_uf, total_beneficios, plazo, tasa_anual, seguro_mensual,
+                      prepago_monto, prepago_ano, uf_clp):
+    """Cifras de la página para un escenario completo, compartidas entre sesiones."""
+    k = clave("escenario", precio_uf=precio_uf, pie_uf=pie_uf, total_beneficios=total_beneficios,
+              plazo=plazo, tasa_anual=tasa_anual, seguro_mensual=seguro_mensual,
+              prepago_monto=prepago_monto, prepago_ano=prepago_ano, uf_clp=uf_clp)
+
+    def calcular():
+        credito_uf = max(precio_uf - pie_uf - total_beneficios, 0)
+        credito = simular_credito(credito_uf, tasa_anual, plazo, prepago_monto, prepago_ano)
+        indice = credito["indice"]
+        dividendo_clp = credito["dividendo_uf"] * uf_clp + seguro_mensual
+        monto_total_uf = credito["capital_total"] + credito["interes_total"]
+        return {
+            "credito_uf": credito_uf,
+            "credito_clp": credito_uf * uf_clp,
+            "dividendo_uf": credito["dividendo_uf"],
+            "dividendo_clp": dividendo_clp,
+            "sueldo_recomendado": dividendo_clp / 0.25,
+            "interes_total": credito["interes_total"],
+            "capital_total": credito["capital_total"],
+            "monto_total_uf": monto_total_uf,
+            "monto_total_clp": monto_total_uf * uf_clp,
+            "anio_salto": credito["anio_salto"],
+            "primeros_5_anios_interes": float(indice.interes_entre(1, 60)),
+            "saldo_prepago": float(indice.saldo_en(prepago_ano * 12)) if prepago_ano else 0.0,
+        }
+    return cache.obtener_o_calcular(k, calcular)
+
+
+@lru_cache(maxsize=TAMANO_CACHE)
+def comparar_plazos(credito_uf, tasa_anual, pie_uf, seguro_mensual, uf_clp, plazos=PLAZOS_COMUNES):
+    plazos = np.asarray(plazos)
+    meses = plazos * 12
+    dividendo_uf = dividendo(credito_uf, tasa_anual, plazos)
+    dividendo_clp = dividendo_uf * uf_clp + seguro_mensual
+    total_pagar_uf = dividendo_uf * meses
+    return _solo_lectura({
+        "plazo": plazos,
+        "dividendo_uf": dividendo_uf,
+        "dividendo_clp": dividendo_clp,
+        "renta_sugerida_clp": dividendo_clp / 0.25,
+        "total_pagar_uf": total_pagar_uf,
+        "total_pagar_clp": dividendo_clp * meses,
+        "interes_total_uf": total_pagar_uf - credito_uf,
+        "monto_total_con_pie_uf": pie_uf + total_pagar_uf,
+    })
+
+
+@lru_cache(maxsize=TAMANO_CACHE)
+def df_comparativa(credito_uf, tasa_anual, pie_uf, seguro_mensual, uf_clp, plazo):
+    # Columnas numéricas (ordenables); el formato lo aplica el Styler
+    import pandas as pd
+
+    c = comparar_plazos(credito_uf, tasa_anual, pie_uf, seguro_mensual, uf_clp)
+    df_comp = pd.DataFrame({
+        "↑ Plazo (años)": c["plazo"],
+        "Tasa (%)": tasa_anual * 100,
+        "Dividendo mensual UF": c["dividendo_uf"],
+        "Dividendo mensual CLP": c["dividendo_clp"],
+        "Renta sugerida CLP": c["renta_sugerida_clp"],
+        "Monto total: crédito+interés UF": c["total_pagar_uf"],
+        "Intereses totales UF": c["interes_total_uf"],
+        "Intereses totales CLP": c["interes_total_uf"] * uf_clp,
+        "Monto total: crédito+interés+Pie UF": c["monto_total_con_pie_uf"],
+        "Simulado": c["plazo"] == plazo,
+    })
+    return df_comp
+
+
+def _resaltar_simulado(row):
+    return ['background-color: #D0E9FF; font-weight: bold;' if row['Simulado'] else '' for _ in row]
+
+
+def tabla_comparativa(credito_uf, tasa_anual, pie_uf, seguro_mensual, uf_clp, plazo):
+    # Styler nuevo en cada llamada: Streamlit lo modifica al dibujarlo (uuid,
+    # ctx), así que no puede compartirse entre sesiones como el DataFrame
+    df_comp = df_comparativa(credito_uf, tasa_anual, pie_uf, seguro_mensual, uf_clp, plazo)
+    return df_comp.style.apply(_resaltar_simulado, axis=1).format({
+        "Tasa (%)": "{:.2f} %",
+        "Dividendo mensual UF": "{:,.2f}",
+        "Dividendo mensual CLP": "${:,.0f}",
+        "Renta sugerida CLP": "${:,.0f}",
+        "Monto total: crédito+interés UF": "{:,.2f}",
+        "Intereses totales UF": "{:,.2f}",
+        "Intereses totales CLP": "${:,.0f}",
+        "Monto total: crédito+interés+Pie UF": "{:,.2f}",
+        "Simulado": lambda v: "✔️ Simulado" if v else "",
+    })
+
+
+@lru_cache(maxsize=4)
+def grilla_sensibilidad(precio_uf, total_beneficios, seguro_mensual, uf_clp):
+    return _solo_lectura(sensibilidad.calcular_grilla(precio_uf, total_beneficios, seguro_mensual, uf_clp))
+
+
+@lru_cache(maxsize=32)
+def figura_sensibilidad(precio_uf, total_beneficios, seguro_mensual, uf_clp, pie_pct, metrica):
+    import plotly.graph_objects as go
+
+    grilla = grilla_sensibilidad(precio_uf, total_beneficios, seguro_mensual, uf_clp)
+    i_pie = sensibilidad.indice_cercano(grilla["pie_pct"], pie_pct)
+    unidad = "UF" if metrica.endswith("_uf") else "CLP"
+    fig = go.Figure(go.Heatmap(
+        x=grilla["tasa"] * 100,
+        y=grilla["plazo"],
+        z=grilla[metrica][:, :, i_pie],
+        colorscale="Blues",
+        colorbar=dict(title=unidad),
+        hovertemplate=f"Tasa %{{x:.2f}}%<br>Plazo %{{y}} años<br>%{{z:,.{2 if unidad == 'UF' else 0}f}} {unidad}<extra></extra>",
+    ))
+    fig.update_layout(
+        title=f"{sensibilidad.METRICAS[metrica]} con pie de {grilla['pie_pct'][i_pie]:.0%}",
+        xaxis_title="Tasa anual (%)", yaxis_title="Plazo (años)", height=450,
+    )
+    return graficos.preparar(fig, "sensibilidad", decimales=2 if unidad == "UF" else 0)
+
+
+@lru_cache(maxsize=TAMANO_CACHE)
+def df_asequibilidad(ingreso_clp, tasa_anual, uf_clp, seguro_mensual, pie_pct, beneficios,
+                     plazos=(5, 10, 15, 20, 25, 30)):
+    import pandas as pd
+
+    t = asequibilidad.tabla_asequibilidad([ingreso_clp], plazos, tasa_anual, uf_clp, seguro_mensual, pie_pct, beneficios)
+    return pd.DataFrame({
+        "Plazo (años)": t["plazo"],
+        "Precio máximo UF": t["precio_uf"][0],
+        "Precio máximo CLP": t["precio_uf"][0] * uf_clp,
+        "Crédito máximo UF": t["credito_uf"][0],
+        "Pie requerido UF": t["pie_uf"][0],
+    })
+
+
+def tabla_asequibilidad_df(ingreso_clp, tasa_anual, uf_clp, seguro_mensual, pie_pct, beneficios,
+                           plazos=(5, 10, 15, 20, 25, 30)):
+    # Como `tabla_comparativa`: sólo el DataFrame se memoiza, el Styler es por llamada
+    return df_asequibilidad(ingreso_clp, tasa_anual, uf_clp, seguro_mensual, pie_pct, beneficios, plazos).style.format({
+        "Precio máximo UF": "{:,.2f}",
+        "Precio máximo CLP": "${:,.0f}",
+        "Crédito máximo UF": "{:,.2f}",
+        "Pie requerido UF": "{:,.2f}",
+    })
+
+
+@lru_cache(maxsize=TAMANO_CACHE)
+def figura_distribucion(pie_uf, capital_total, interes_total, uf_clp):
+    import plotly.graph_objects as go
+
+    fig = go.Figure(data=[go.Pie(
+        labels=["Pie Inicial", "Capital", "Interés"],
+        values=[pie_uf, capital_total, interes_total],
+        hole=0.4,
+        marker=dict(colors=["#2980B9", "#1ABC9C", "#F39C12"]),
+        customdata=[round(pie_uf * uf_clp), round(capital_total * uf_clp), round(interes_total * uf_clp)],
+        hovertemplate="<b>%{label}</b><br>Monto: %{value:.2f} UF<br>~$%{customdata:,} CLP<extra></extra>"
+    )])
+    fig.update_layout(title="Distribución total del pago (incluyendo Pie Inicial)", height=400, showlegend=True)
+    return graficos.preparar(fig, "distribucion")
+
+
+@lru_cache(maxsize=TAMANO_CACHE)
+def figura_anual(credito_uf, tasa_anual, plazo, prepago_monto, prepago_ano, uf_clp):
+    import plotly.graph_objects as go
+
+    anios = simular_credito(credito_uf, tasa_anual, plazo, prepago_monto, prepago_ano)["indice"].rollup("anio")
+    years = anios["periodo"]
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=years,
+        y=anios["capital"] + anios["interes"],
+        name="Cuota Total (UF)",
+        mode="lines+markers",
+        line=dict(color="royalblue"),
+        hovertemplate="Año %{x}<br>Cuota Total: %{y:.2f} UF"
+    ))
+    fig.add_trace(go.Bar(
+        x=years,
+        y=anios["interes"],
+        name="Interés",
+        marker_color="orange",
+        customdata=np.round(anios["interes"] * uf_clp),
+        hovertemplate="<b>Año %{x}</b><br>Interés: %{y:.2f} UF<br>(~$%{customdata:,} CLP)<extra></extra>"
+    ))
+    fig.add_trace(go.Bar(
+        x=years,
+        y=anios["capital"],
+        name="Capital",
+        marker_color="teal",
+        customdata=np.round(anios["capital"] * uf_clp),
+        hovertemplate="<b>Año %{x}</b><br>Capital: %{y:.2f} UF<br>(~$%{customdata:,} CLP)<extra></extra>"
+    ))
+    fig.update_layout(barmode='stack', title="📉 Evolución anual: Interés vs Capital", xaxis_title="Año", yaxis_title="UF", height=450)
+    return graficos.preparar(fig, "anual")
+
+
+@lru_cache(maxsize=TAMANO_CACHE)
+def figura_mensual(credito_uf, tasa_anual, plazo, prepago_monto, prepago_ano):
+    # Resolución mensual: con plazos largos pasa a WebGL y el presupuesto decide si se reduce con LTTB
+    from plotly.subplots import make_subplots
+
+    tabla = simular_credito(credito_uf, tasa_anual, plazo, prepago_monto, prepago_ano)["tabla"]
+    mes = tabla["mes"]
+    webgl = graficos.usar_webgl(3 * len(mes))
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.08,
+                        subplot_titles=("Saldo restante (UF)", "Composición del dividendo (UF)"))
+    fig.add_trace(graficos.traza_linea(webgl, x=mes, y=tabla["saldo"], name="Saldo", line=dict(color="royalblue"),
+                                       hovertemplate="Mes %{x}<br>Saldo: %{y:,.2f} UF<extra></extra>"), row=1, col=1)
+    fig.add_trace(graficos.traza_linea(webgl, x=mes, y=tabla["interes"], name="Interés", line=dict(color="orange"),
+                                       hovertemplate="Mes %{x}<br>Interés: %{y:,.2f} UF<extra></extra>"), row=2, col=1)
+    fig.add_trace(graficos.traza_linea(webgl, x=mes, y=tabla["capital"], name="Capital", line=dict(color="teal"),
+                                       hovertemplate="Mes %{x}<br>Capital: %{y:,.2f} UF<extra></extra>"), row=2, col=1)
+    fig.update_layout(height=550, title="📆 Evolución mensual: saldo y dividendo")
+    fig.update_xaxes(title_text="Mes", row=2, col=1)
+    return graficos.preparar(fig, "mensual")
+
+
+@lru_cache(maxsize=32)
+def simular_montecarlo(credito_uf, tasa_anual, plazo, uf_clp, seguro_mensual=0.0, ingreso_clp=None, **opciones):
+    # Misma semilla y mismas entradas: mismas bandas, no hace falta re-simular
+    return _solo_lectura(montecarlo.simular(credito_uf, tasa_anual, plazo, uf_clp, seguro_mensual, ingreso_clp, **opciones))
+
+
+@lru_cache(maxsize=32)
+def figura_montecarlo(credito_uf, tasa_anual, plazo, uf_clp, seguro_mensual=0.0, ingreso_clp=None, **opciones):
+    import plotly.graph_objects as go
+
+    mc = simular_montecarlo(credito_uf, tasa_anual, plazo, uf_clp, seguro_mensual, ingreso_clp, **opciones)
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=mc["mes"], y=mc["dividendo_clp"][2], line=dict(width=0), name="P95", hovertemplate="Mes %{x}<br>P95: $%{y:,.0f}"))
+    fig.add_trace(go.Scatter(x=mc["mes"], y=mc["dividendo_clp"][0], line=dict(width=0), fill="tonexty", fillcolor="rgba(46,134,193,0.25)", name="P5", hovertemplate="Mes %{x}<br>P5: $%{y:,.0f}"))
+    fig.add_trace(go.Scatter(x=mc["mes"], y=mc["dividendo_clp"][1], line=dict(color="royalblue"), name="P50", hovertemplate="Mes %{x}<br>P50: $%{y:,.0f}"))
+    fig.update_layout(title="Dividendo mensual en CLP (bandas P5–P95)", xaxis_title="Mes", yaxis_title="CLP", height=400)
+    return graficos.preparar(fig, "montecarlo", decimales=0)
+
+
+def guardar_escenario(espacio, nombre, precio_uf, pie_uf, total_beneficios, plazo, tasa_anual, seguro_mensual,
+                      prepago_monto, prepago_ano, uf_clp):
+    # El calendario se calcula una sola vez, al guardar; después sólo se leen sus curvas
+    entradas = dict(precio_uf=precio_uf, pie_uf=pie_uf, total_beneficios=total_beneficios, plazo=plazo,
+                    tasa_anual=tasa_anual, seguro_mensual=seguro_mensual, prepago_monto=prepago_monto,
+                    prepago_ano=prepago_ano, uf_clp=uf_clp)
+    e = simular_escenario(**entradas)
+    tabla = simular_credito(e["credito_uf"], tasa_anual, plazo, prepago_monto, prepago_ano)["tabla"]
+    # Con prepago el saldo llega a 0 antes del plazo: el término es el primer mes sin saldo
+    mes_termino = min(int((tabla["saldo"] > 0).sum()) + 1, len(tabla["mes"]))
+    espacio.guardar(nombre, entradas, {**e, "mes_termino": mes_termino},
+                    tabla["saldo"], tabla["capital"] + tabla["interes"])
+
+
+@lru_cache(maxsize=32)
+def tabla_escenarios(espacio, version, nombres):
+    """Métricas de los escenarios elegidos y su diferencia contra el primero."""
+    import pandas as pd
+
+    filas, _, _ = espacio.seleccion(nombres)
+    df = pd.DataFrame({"Escenario": list(nombres), "Tasa %": filas["tasa_anual"] * 100,
+                       "Plazo": filas["plazo"].astype(int)})
+    for m, titulo in escenarios.METRICAS.items():
+        df[titulo] = filas[m]
+    for m, diferencia in espacio.diferencias(nombres, ("dividendo_clp", "interes_total", "monto_total_uf")).items():
+        df[f"Δ {escenarios.METRICAS[m]}"] = diferencia
+    return df
+
+
+@lru_cache(maxsize=32)
+def figura_escenarios(espacio, version, nombres):
+    from plotly.subplots import make_subplots
+
+    filas, saldo, cuota = espacio.seleccion(nombres)
+    webgl = graficos.usar_webgl(2 * int(filas["mes_termino"].sum()))
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.08,
+                        subplot_titles=("Saldo restante (UF)", "Dividendo mensual (UF)"))
+    for i, nombre in enumerate(nombres):
+        n = int(filas["mes_termino"][i])
+        mes = np.arange(1, n + 1)
+        color = dict(color=f"hsl({i * 360 // max(len(nombres), 1)},65%,45%)")
+        fig.add_trace(graficos.traza_linea(webgl, x=mes, y=saldo[i, :n], name=nombre, legendgroup=nombre, line=color,
+                                 hovertemplate="Mes %{x}<br>Saldo: %{y:,.2f} UF"), row=1, col=1)
+        fig.add_trace(graficos.traza_linea(webgl, x=mes, y=cuota[i, :n], name=nombre, legendgroup=nombre, line=color,
+                                 showlegend=False, hovertemplate="Mes %{x}<br>Dividendo: %{y:,.2f} UF"), row=2, col=1)
+    fig.update_layout(height=600, title="📈 Escenarios guardados")
+    fig.update_xaxes(title_text="Mes", row=2, col=1)
+    return graficos.preparar(fig, "escenarios")
+
+
+@lru_cache(maxsize=32)
+def backtest_credito(credito_uf, tasa_anual, plazo, prepago_monto, prepago_ano, fecha_inicio, seguro_mensual,
+                     inflacion):
+    # Las cuotas en UF del calendario, pagadas con la UF efectiva desde `fecha_inicio`
+    tabla = simular_credito(credito_uf, tasa_anual, plazo, prepago_monto, prepago_ano)["tabla"]
+    return _solo_lectura(historico.backtest(tabla["capital"] + tabla["interes"], fecha_inicio, historico.almacen(),
+                                            seguro_mensual, inflacion))
+
+
+@lru_cache(maxsize=32)
+def figura_backtest(credito_uf, tasa_anual, plazo, prepago_monto, prepago_ano, fecha_inicio, seguro_mensual,
+                    inflacion):
+    import plotly.graph_objects as go
+
+    bt = backtest_credito(credito_uf, tasa_anual, plazo, prepago_monto, prepago_ano, fecha_inicio, seguro_mensual,
+                          inflacion)
+    obs = bt["observado"]
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=bt["fechas"][obs], y=bt["pago_clp"][obs], name="Pagado (UF observada)",
+                             line=dict(color="royalblue"), hovertemplate="%{x}<br>$%{y:,.0f} CLP"))
+    if not obs.all():
+        fig.add_trace(go.Scatter(x=bt["fechas"][~obs], y=bt["pago_clp"][~obs], name="Proyectado",
+                                 line=dict(color="royalblue", dash="dot"), hovertemplate="%{x}<br>$%{y:,.0f} CLP"))
+    fig.update_layout(title="Dividendo mensual en CLP con la UF histórica", xaxis_title="Fecha", yaxis_title="CLP",
+                      height=400)
+    return graficos.preparar(fig, "backtest", decimales=0)
+
+
+@lru_cache(maxsize=TAMANO_CACHE)
+def simular_con_eventos(credito_uf, tasa_anual, plazo, lista_eventos=(), seguro_mensual=0.0):
+    return eventos.simular_eventos(credito_uf, tasa_anual, plazo, lista_eventos, seguro_mensual)
+
+
+@lru_cache(maxsize=TAMANO_CACHE)
+def ranking_estrategias(credito_uf, tasa_anual, plazo, lista_eventos=(), seguro_mensual=0.0):
+    # Los mismos eventos, con todos los prepagos en cada modo, contra no prepagar
+    import pandas as pd
+
+    def con_modo(modo):
+        return [e._replace(modo=modo) if e.tipo == "prepago" else e for e in lista_eventos]
+
+    estrategias = {
+        "Según lo ingresado": lista_eventos,
+        "Prepagos reducen plazo": con_modo("plazo"),
+        "Prepagos reducen dividendo": con_modo("dividendo"),
+        "Sin prepagos": [e for e in lista_eventos if e.tipo != "prepago"],
+    }
+    filas = [
+        (nombre, r["interes_total"], r["mes_termino"], r["prepagos_total"])
+        for nombre, r in eventos.comparar_estrategias(credito_uf, tasa_anual, plazo, estrategias, seguro_mensual)
+    ]
+    return pd.DataFrame(filas, columns=["Estrategia", "Intereses totales UF", "Mes de término", "Prepagos UF"])
+
+
+@lru_cache(maxsize=TAMANO_CACHE)
+def tabla_agregada(credito_uf, tasa_anual, plazo, prepago_monto=0.0, prepago_ano=0, nivel="mes"):
+    return simular_credito(credito_uf, tasa_anual, plazo, prepago_monto, prepago_ano)["indice"].rollup(nivel)
+
+
+def exportar_tabla(credito_uf, tasa_anual, plazo, prepago_monto, prepago_ano, uf_clp, formato):
+    # Se invoca sólo al hacer clic en descargar (st.download_button diferido)
+    with seccion(f"exportacion_{formato}"):
+        tabla = simular_credito(credito_uf, tasa_anual, plazo, prepago_monto, prepago_ano)["tabla"]
+        return exportacion.exportar(tabla, uf_clp, formato)
+
+
+def clave_reporte(precio_uf, pie_uf, total_beneficios, plazo, tasa_anual, seguro_mensual,
+                  prepago_monto, prepago_ano, uf_clp, cap_rate, diagnosticos):
+    return clave("pdf", precio_uf=precio_uf, pie_uf=pie_uf, total_beneficios=total_beneficios, plazo=plazo,
+                 tasa_anual=tasa_anual, seguro_mensual=seguro_mensual, prepago_monto=prepago_monto,
+                 prepago_ano=prepago_ano, uf_clp=uf_clp, cap_rate=cap_rate, diagnosticos=diagnosticos)
+
+
+def datos_reporte(precio_uf, pie_uf, total_beneficios, plazo, tasa_anual, seguro_mensual,
+                  prepago_monto, prepago_ano, uf_clp, cap_rate, diagnosticos):
+    # Todo lo que necesita `reporte_pdf.generar_pdf`, sacado de las cachés existentes
+    from datetime import datetime
+
+    e = simular_escenario(precio_uf, pie_uf, total_beneficios, plazo, tasa_anual, seguro_mensual,
+                          prepago_monto, prepago_ano, uf_clp)
+    credito = simular_credito(e["credito_uf"], tasa_anual, plazo, prepago_monto, prepago_ano)
+    resumen = [
+        ("Precio de la propiedad", f"{precio_uf:,.2f} UF"),
+        ("Pie inicial", f"{pie_uf:,.2f} UF (~${pie_uf * uf_clp:,.0f} CLP)"),
+        ("Beneficios/Subsidios aplicados", f"{total_beneficios:,.2f} UF"),
+        ("Monto total crédito pedido", f"{e['credito_uf']:,.2f} UF (~${e['credito_clp']:,.0f} CLP)"),
+        ("Tasa anual / plazo", f"{tasa_anual * 100:.2f}% a {plazo} años"),
+        ("Dividendo mensual", f"{e['dividendo_uf']:,.2f} UF (~${e['dividendo_clp']:,.0f} CLP)"),
+        ("Intereses totales", f"{e['interes_total']:,.2f} UF (~${e['interes_total'] * uf_clp:,.0f} CLP)"),
+        ("Monto total a pagar", f"{e['monto_total_uf']:,.2f} UF (~${e['monto_total_clp']:,.0f} CLP)"),
+        ("Sueldo requerido (25%)", f"~${e['sueldo_recomendado']:,.0f} CLP"),
+        ("Cap Rate estimado", f"{cap_rate:.2f} %"),
+    ]
+    if prepago_monto > 0 and prepago_ano > 0:
+        resumen.append(("Prepago", f"{prepago_monto:,.2f} UF en el año {prepago_ano}"))
+    return {
+        "fecha": datetime.now().strftime("%d-%m-%Y"),
+        "uf_clp": uf_clp,
+        "plazo": plazo,
+        "resumen": resumen,
+        "comparativa": comparar_plazos(e["credito_uf"], tasa_anual, pie_uf, seguro_mensual, uf_clp),
+        "diagnosticos": diagnosticos,
+        "clave_calendario": clave("credito", credito_uf=e["credito_uf"], tasa_anual=tasa_anual, plazo=plazo,
+                                  prepago_monto=prepago_monto, prepago_ano=prepago_ano),
+        "anual": credito["indice"].rollup("anio"),
+        "tabla": credito["tabla"],
+    }
+
+
+# Sin memoizar: evaluar las reglas de un escenario son unas pocas máscaras, y
+# así cada rerun queda en los aciertos por regla (`diagnostico.estadisticas`)
+def diagnosticar(tasa_anual, pie_pct, plazo, ratio_total, sueldo_recomendado, anio_salto,
+                 primeros_5_anios_interes, uf_clp, prepago_monto, prepago_ano, saldo_prepago,
+                 cap_rate, total_beneficios, objetivo, edad, tipo_trabajo, reglas=diagnostico.REGLAS):
+    valores = dict(tasa_anual=tasa_anual, pie_pct=pie_pct, plazo=plazo, ratio_total=ratio_total,
+                   sueldo_recomendado=sueldo_recomendado, anio_salto=anio_salto or 0,
+                   primeros_5_anios_interes=primeros_5_anios_interes, uf_clp=uf_clp,
+                   prepago_monto=prepago_monto, prepago_ano=prepago_ano, saldo_prepago=saldo_prepago,
+                   cap_rate=cap_rate, total_beneficios=total_beneficios, objetivo=objetivo, edad=edad,
+                   tipo_trabajo=tipo_trabajo)
+    return diagnostico.mensajes(valores, diagnostico.evaluar(valores, reglas), reglas)
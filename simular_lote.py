@@ -0,0 +1,193 @@
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import diagnostico
+from amortizacion import resumen_lote
+
+# --- Simulación masiva por línea de comandos ---
+# Lee una cartera de créditos por bloques (CSV o Parquet), calcula cada bloque
+# en un pool de procesos y escribe los resultados a medida que terminan, en el
+# mismo orden de entrada y con memoria acotada.
+#
+# Columnas de entrada: precio_uf, pie_uf, plazo, tasa_anual (decimal, 0.037)
+# y opcionalmente beneficios, seguro_mensual, prepago_monto, prepago_ano.
+# Para el diagnóstico también se leen edad, tipo_trabajo, objetivo y
+# arriendo_mensual (CLP), con los valores por defecto de la página.
+
+COLUMNAS_OPCIONALES = {"beneficios": 0.0, "seguro_mensual": 0.0, "prepago_monto": 0.0, "prepago_ano": 0}
+PERFIL_POR_DEFECTO = {"edad": 30, "tipo_trabajo": "Dependiente", "objetivo": "Primera vivienda", "arriendo_mensual": 0.0}
+
+
+def simular_bloque(df, uf_clp):
+    for col, valor in COLUMNAS_OPCIONALES.items():
+        if col not in df:
+            df[col] = valor
+    credito_uf = np.maximum(
+        df["precio_uf"].to_numpy(float) - df["pie_uf"].to_numpy(float) - df["beneficios"].to_numpy(float), 0
+    )
+    res = resumen_lote(
+        credito_uf,
+        df["tasa_anual"].to_numpy(float),
+        df["plazo"].to_numpy(int),
+        df["prepago_monto"].fillna(0).to_numpy(float),
+        df["prepago_ano"].fillna(0).to_numpy(int),
+    )
+    dividendo_clp = res["dividendo"] * uf_clp + df["seguro_mensual"].to_numpy(float)
+    salida = df.copy()
+    salida["credito_uf"] = credito_uf
+    salida["dividendo_uf"] = res["dividendo"]
+    salida["dividendo_clp"] = dividendo_clp
+    salida["sueldo_recomendado"] = dividendo_clp / 0.25
+    salida["interes_total"] = res["interes_total"]
+    salida["monto_total"] = res["capital_total"] + res["interes_total"]
+    salida["anio_cruce"] = res["anio_cruce"]
+    salida["interes_5_anios"] = res["interes_5_anios"]
+    salida["saldo_prepago"] = res["saldo_prepago"]
+    return salida
+
+
+def campos_diagnostico(d, uf_clp):
+    """Campos del motor de diagnóstico desde entradas y resultados (DataFrame o dict de un escenario)."""
+    def col(c, defecto):
+        return np.asarray(d[c]) if c in d else np.asarray(defecto)
+
+    precio = col("precio_uf", 0.0).astype(float)
+    credito = col("credito_uf", 0.0).astype(float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        campos = {
+            "tasa_anual": col("tasa_anual", 0.0),
+            "pie_pct": np.where(precio > 0, col("pie_uf", 0.0) / precio, 0.0),
+            "plazo": col("plazo", 0),
+            "ratio_total": np.where(credito > 0, col("monto_total", 0.0) / credito, np.inf),
+            "sueldo_recomendado": col("sueldo_recomendado", 0.0),
+            "anio_salto": col("anio_cruce", 0),
+            "primeros_5_anios_interes": col("interes_5_anios", 0.0),
+            "uf_clp": np.asarray(uf_clp),
+            "prepago_monto": col("prepago_monto", 0.0),
+            "prepago_ano": col("prepago_ano", 0),
+            "saldo_prepago": col("saldo_prepago", 0.0),
+            "cap_rate": np.where(precio > 0, col("arriendo_mensual", 0.0) * 12 / (precio * uf_clp) * 100, 0.0),
+            "total_beneficios": col("beneficios", 0.0),
+        }
+    campos.update({c: col(c, v) for c, v in PERFIL_POR_DEFECTO.items() if c != "arriendo_mensual"})
+    return dict(zip(campos, np.broadcast_arrays(*campos.values())))
+
+
+def diagnosticar_bloque(salida, uf_clp, reglas=diagnostico.REGLAS):
+    """Agrega la columna `diagnostico` ("TASA_BUENA;PIE_BUENO;...") y devuelve los aciertos por regla."""
+    salida = salida.fillna({c: v for c, v in PERFIL_POR_DEFECTO.items() if c in salida})
+    mascaras = diagnostico.evaluar(campos_diagnostico(salida, uf_clp), reglas)
+    salida["diagnostico"] = diagnostico.codigos(mascaras, reglas)
+    return salida, diagnostico.conteos(mascaras, reglas)
+
+
+def _procesar(bloque, uf_clp, reglas):
+    salida = simular_bloque(bloque, uf_clp)
+    return diagnosticar_bloque(salida, uf_clp, reglas) if reglas else (salida, {})
+
+
+def leer_bloques(ruta, tamano):
+    if ruta.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        for lote in pq.ParquetFile(ruta).iter_batches(batch_size=tamano):
+            yield lote.to_pandas()
+    else:
+        yield from pd.read_csv(ruta, chunksize=tamano)
+
+
+class Escritor:
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.parquet = ruta.endswith(".parquet")
+        self._writer = None
+        self._primero = True
+
+    def escribir(self, df):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            tabla = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.ruta, tabla.schema)
+            self._writer.write_table(tabla)
+        else:
+            df.to_csv(self.ruta, mode="w" if self._primero else "a", header=self._primero, index=False)
+        self._primero = False
+
+    def cerrar(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def simular_archivo(entrada, salida, uf_clp, tamano=100_000, procesos=None, reglas=None, conteos=None):
+    # Con `reglas` se agrega el diagnóstico; los aciertos por regla se suman en `conteos`
+    procesos = procesos or os.cpu_count() or 1
+    escritor = Escritor(salida)
+    filas = 0
+
+    def escribir(futuro):
+        nonlocal filas
+        df, aciertos = futuro.result()
+        escritor.escribir(df)
+        filas += len(df)
+        if conteos is not None:
+            conteos.update(aciertos)
+
+    try:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            pendientes = []
+            for bloque in leer_bloques(entrada, tamano):
+                pendientes.append(pool.submit(_procesar, bloque, uf_clp, reglas))
+                # Ventana acotada: no más de dos bloques en vuelo por proceso
+                while len(pendientes) >= 2 * procesos:
+                    escribir(pendientes.pop(0))
+            for futuro in pendientes:
+                escribir(futuro)
+    finally:
+        escritor.cerrar()
+    return filas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulación hipotecaria masiva (CSV/Parquet).")
+    parser.add_argument("entrada", help="Archivo de créditos (.csv o .parquet)")
+    parser.add_argument("salida", help="Archivo de resultados (.csv o .parquet)")
+    parser.add_argument("--uf", type=float, help="Valor UF en CLP (por defecto, el indicador vigente; obligatorio sin conexión)")
+    parser.add_argument("--bloque", type=int, default=100_000, help="Filas por bloque")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos en paralelo")
+    parser.add_argument("--diagnostico", action="store_true", help="Agrega los códigos de diagnóstico")
+    parser.add_argument("--reglas", help="JSON con umbrales por banco o producto (implica --diagnostico)")
+    args = parser.parse_args(argv)
+
+    uf_clp = args.uf
+    if uf_clp is None:
+        from indicadores import obtener_indicadores
+        indicadores, origen, _ = obtener_indicadores()
+        if origen == "defecto":
+            # Sin indicadores en línea ni en caché la UF sería un valor fijo de respaldo
+            parser.error("no se pudo obtener la UF vigente; indica el valor con --uf")
+        uf_clp = indicadores["uf"]
+
+    reglas = None
+    if args.reglas:
+        reglas = diagnostico.cargar_reglas(args.reglas)
+    elif args.diagnostico:
+        reglas = diagnostico.REGLAS
+    conteos = Counter()
+
+    inicio = time.perf_counter()
+    filas = simular_archivo(args.entrada, args.salida, uf_clp, args.bloque, args.procesos, reglas, conteos)
+    print(f"{filas:,} créditos simulados en {time.perf_counter() - inicio:.1f} s (UF = {uf_clp:,.2f})", file=sys.stderr)
+    for codigo, n in sorted(conteos.items(), key=lambda x: -x[1]):
+        print(f"  {codigo:<20} {n:>10,} ({n / max(filas, 1):.1%})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()